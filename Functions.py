@@ -1,129 +1,725 @@
 import database
+import contextlib
+import functools
+import itertools
+import math
+import os
+import re
+import tempfile
+import time
 import numpy as np
 
-def remove_dominated_strategies(matrix, weak=True):
+# Ограничение на число элементов в одном блоке попарных сравнений (около 4 МБ булевых значений)
+DOMINANCE_BLOCK_ELEMENTS = 1 << 22
+# Подматрица оставшихся стратегий копируется целиком, только если в ней не больше элементов;
+# иначе, а также для np.memmap, строки читаются блоками и исходные данные не копируются
+DOMINANCE_GATHER_ELEMENTS = 1 << 24
+
+def _compare_rows(chunk, candidates, weak):
+    """
+    Для каждой строки chunk определяет, доминирует ли над ней хотя бы одна строка candidates.
+    """
+    chunk = chunk[:, None, :]
+    candidates = candidates[None, :, :]
+    if weak:
+        # Слабое доминирование: строка нигде не лучше другой и хотя бы раз хуже
+        not_better = ~(chunk > candidates).any(axis=2)
+        worse_somewhere = (chunk < candidates).any(axis=2)
+        return (not_better & worse_somewhere).any(axis=1)
+    # Строгое доминирование: строка везде хуже другой
+    return (chunk < candidates).all(axis=2).any(axis=1)
+
+def _dominated_mask(payoffs, strategies, opponents, weak=True, progress=None):
+    """
+    Возвращает булеву маску доминируемых стратегий среди strategies (индексы по оси 0 payoffs)
+    с учетом только оставшихся стратегий противника opponents (индексы по оси 1).
+    Все пары строк сравниваются широковещательно, блоками ограниченного размера.
+    После каждого блока вызывается progress(доля обработанных строк), если он задан.
+    """
+    n, m = len(strategies), len(opponents)
+    dominated = np.zeros(n, dtype=bool)
+    if n < 2:
+        return dominated
+
+    if n * m <= DOMINANCE_GATHER_ELEMENTS and not isinstance(payoffs, np.memmap):
+        sub = payoffs[np.ix_(strategies, opponents)]
+        block = max(1, DOMINANCE_BLOCK_ELEMENTS // max(1, n * m))
+        for start in range(0, n, block):
+            dominated[start:start + block] = _compare_rows(sub[start:start + block], sub, weak)
+            if progress is not None:
+                progress(min(start + block, n) / n)
+        return dominated
+
+    # Большая или отображенная в память матрица: блоки строк читаются по мере необходимости
+    block = max(1, math.isqrt(DOMINANCE_BLOCK_ELEMENTS // max(1, m)))
+    for start in range(0, n, block):
+        chunk = payoffs[strategies[start:start + block]][:, opponents]
+        chunk_dominated = np.zeros(len(chunk), dtype=bool)
+        for candidate_start in range(0, n, block):
+            candidates = payoffs[strategies[candidate_start:candidate_start + block]][:, opponents]
+            chunk_dominated |= _compare_rows(chunk, candidates, weak)
+            if chunk_dominated.all():
+                break
+        dominated[start:start + block] = chunk_dominated
+        if progress is not None:
+            progress(min(start + block, n) / n)
+
+    return dominated
+
+def _column_major(matrix, stack):
+    """
+    Матрица второго игрока, транспонированная для прохода по столбцам.
+    Для np.memmap в C-порядке .T читал бы столбцы файла с шагом через все его страницы,
+    поэтому транспонированная копия один раз записывается квадратными блоками во временный файл
+    рядом с исходным (файл удаляется при закрытии stack).
+    """
+    if not isinstance(matrix, np.memmap) or not matrix.flags.c_contiguous:
+        return matrix.T
+    directory = os.path.dirname(os.path.abspath(matrix.filename)) if matrix.filename else None
+    file = stack.enter_context(tempfile.TemporaryFile(dir=directory))
+    rows, cols = matrix.shape
+    transposed = np.memmap(file, dtype=matrix.dtype, mode="w+", shape=(cols, rows))
+    tile = math.isqrt(DOMINANCE_BLOCK_ELEMENTS)
+    for row_start in range(0, rows, tile):
+        for col_start in range(0, cols, tile):
+            block = matrix[row_start:row_start + tile, col_start:col_start + tile]
+            transposed[col_start:col_start + tile, row_start:row_start + tile] = block.T
+    return transposed
+
+def dominance_survivors(player1_matrix, player2_matrix, weak=True, progress=None):
+    """
+    Итеративно исключает доминируемые стратегии, не удаляя данные из матриц.
+    Оставшиеся стратегии отслеживаются массивами исходных индексов, поэтому
+    матрицы могут быть и отображенными в память массивами (np.memmap).
+    progress(доля) получает ход текущего прохода: первая половина — строки, вторая — столбцы;
+    исключение, выброшенное из progress, прерывает вычисление.
+    Возвращает (индексы оставшихся строк, индексы оставшихся столбцов).
+    """
+    row_progress = col_progress = None
+    if progress is not None:
+        row_progress = lambda fraction: progress(fraction / 2)
+        col_progress = lambda fraction: progress(0.5 + fraction / 2)
+
+    rows = np.arange(player1_matrix.shape[0])
+    cols = np.arange(player1_matrix.shape[1])
+
+    with contextlib.ExitStack() as stack:
+        player2_columns = _column_major(player2_matrix, stack)
+        while True:
+            removed = False
+
+            # Доминируемые строки первого игрока среди оставшихся стратегий
+            dominated_rows = _dominated_mask(player1_matrix, rows, cols, weak, row_progress)
+            if dominated_rows.any():
+                rows = rows[~dominated_rows]
+                removed = True
+
+            # После исключения строк ищем доминируемые столбцы второго игрока
+            dominated_cols = _dominated_mask(player2_columns, cols, rows, weak, col_progress)
+            if dominated_cols.any():
+                cols = cols[~dominated_cols]
+                removed = True
+
+            # Если нечего исключать — выходим
+            if not removed:
+                break
+
+    return rows, cols
+
+def remove_dominated_strategies(matrix, weak=True, return_indices=False, progress=None):
     """
     Удаляет строго и слабо доминируемые стратегии.
     Параметр weak=True включает удаление слабого доминирования.
+    При return_indices=True дополнительно возвращает исходные индексы оставшихся строк и столбцов.
     """
     player1_matrix, player2_matrix = parse_bimatrix(matrix)
+    rows, cols = dominance_survivors(player1_matrix, player2_matrix, weak, progress)
 
-    while True:
-        removed = False
-
-        # Поиск доминируемых строк для первого игрока
-        dominated_rows = set()
-        for i in range(player1_matrix.shape[0]):
-            for k in range(player1_matrix.shape[0]):
-                if i != k:
-                    if weak:
-                        # Слабое доминирование: одна строка не лучше другой и хотя бы раз хуже
-                        if np.all(player1_matrix[i, :] <= player1_matrix[k, :]) and np.any(player1_matrix[i, :] < player1_matrix[k, :]):
-                            dominated_rows.add(i)
-                    else:
-                        # Строгое доминирование: одна строка всегда хуже другой
-                        if np.all(player1_matrix[i, :] < player1_matrix[k, :]):
-                            dominated_rows.add(i)
-
-        # Удаляем доминируемые строки
-        if dominated_rows:
-            player1_matrix = np.delete(player1_matrix, list(dominated_rows), axis=0)
-            player2_matrix = np.delete(player2_matrix, list(dominated_rows), axis=0)
-            removed = True
-
-        # После удаления строк, ищем и удаляем доминируемые столбцы для второго игрока
-        dominated_cols = set()
-        for j in range(player2_matrix.shape[1]):
-            for m in range(player2_matrix.shape[1]):
-                if j != m:
-                    if weak:
-                        # Слабое доминирование
-                        if np.all(player2_matrix[:, j] <= player2_matrix[:, m]) and np.any(player2_matrix[:, j] < player2_matrix[:, m]):
-                            dominated_cols.add(j)
-                    else:
-                        # Строгое доминирование
-                        if np.all(player2_matrix[:, j] < player2_matrix[:, m]):
-                            dominated_cols.add(j)
-
-        # Удаляем доминируемые столбцы
-        if dominated_cols:
-            player1_matrix = np.delete(player1_matrix, list(dominated_cols), axis=1)
-            player2_matrix = np.delete(player2_matrix, list(dominated_cols), axis=1)
-            removed = True
-
-        # Если нечего удалять — выходим
-        if not removed:
-            break
-
-    return player1_matrix, player2_matrix
+    reduced = (player1_matrix[np.ix_(rows, cols)], player2_matrix[np.ix_(rows, cols)])
+    if return_indices:
+        return reduced + (rows, cols)
+    return reduced
 
 def save_csv_to_db(username, csv_data):
-    conn, cursor = database.get_db_connection()
-
-    # Проверяем, существует ли пользователь с таким username
-    cursor.execute('''SELECT id FROM users WHERE username = ?''', (username,))
-    user = cursor.fetchone()
+    with database.transaction() as cursor:
+        # Проверяем, существует ли пользователь с таким username
+        cursor.execute('''SELECT id FROM users WHERE username = ?''', (username,))
+        user = cursor.fetchone()
 
-    if user:
-        # Если пользователь существует, обновляем его CSV
-        cursor.execute('''UPDATE users SET csv_file = ? WHERE username = ?''', (csv_data, username))
-    else:
-        # Если пользователя нет, вставляем новый
-        cursor.execute('''INSERT INTO users (username, password, csv_file)
-                          VALUES (?, ?, ?)''', (username, "user_password", csv_data))
-    
-    conn.commit()
-    conn.close()
+        if user:
+            # Если пользователь существует, обновляем его CSV
+            cursor.execute('''UPDATE users SET csv_file = ? WHERE username = ?''', (csv_data, username))
+        else:
+            # Если пользователя нет, вставляем новый
+            cursor.execute('''INSERT INTO users (username, password, csv_file)
+                              VALUES (?, ?, ?)''', (username, "user_password", csv_data))
     
+# Разделитель ячеек при склейке таблицы в одну строку
+_CELL_SEPARATOR = "\x00"
+# Скобки вокруг пары выигрышей не влияют на разбор и просто удаляются
+_STRIP_BRACKETS = str.maketrans("", "", "()")
+# Шаблон одной ячейки для разбора отдельных значений и поиска ошибок
+_CELL_PATTERN = re.compile(r"\s*\(?\s*([^;()\s]+)\s*;\s*([^;()\s]+)\s*\)?\s*")
+
+# Сколько последних разобранных таблиц хранить в кэше
+PARSE_CACHE_SIZE = 8
+
 def parse_bimatrix(matrix):
     """
     Преобразует матрицу строковых значений ("(a;b)") в два массива выигрышей для каждого игрока.
+    Вся таблица склеивается в одну строку и преобразуется в числа одним вызовом NumPy;
+    допускаются дробные выигрыши (через точку или запятую).
+    Результат кэшируется по содержимому таблицы, поэтому массивы возвращаются только для чтения.
     """
-    rows, cols = len(matrix), len(matrix[0])
-    player1_matrix = np.zeros((rows, cols))
-    player2_matrix = np.zeros((rows, cols))
-    
-    for i in range(rows):
-        for j in range(cols):
-            value = matrix[i][j].strip("()").split(";")
-            player1_matrix[i, j] = int(value[0])
-            player2_matrix[i, j] = int(value[1])
-    
+    return _parse_bimatrix_cached(tuple(map(tuple, matrix)))
+
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_bimatrix_cached(matrix):
+    player1_matrix, player2_matrix = parse_bimatrix_uncached(matrix)
+    player1_matrix.setflags(write=False)
+    player2_matrix.setflags(write=False)
     return player1_matrix, player2_matrix
 
-def minimax_bimatrix(matrix):
+# Сброс кэша разбора доступен через саму функцию, как у functools.lru_cache
+parse_bimatrix.cache_clear = _parse_bimatrix_cached.cache_clear
+
+def parse_bimatrix_uncached(matrix):
     """
-    Рассчитывает минимаксную стратегию для обоих игроков в биматричной игре.
+    То же, что parse_bimatrix, но без кэша; используется при потоковом разборе больших файлов по частям.
+    """
+    rows, cols = len(matrix), len(matrix[0])
+    # Без этой проверки строки разной длины с подходящим общим числом ячеек склеились бы со сдвигом
+    if any(len(row) != cols for row in matrix):
+        _raise_invalid_cell(matrix)
+    text = _CELL_SEPARATOR.join(itertools.chain.from_iterable(matrix)).translate(_STRIP_BRACKETS)
+    if "," in text:
+        text = text.replace(",", ".")
+
+    # В каждой ячейке ровно одна ";", ячейки разделены _CELL_SEPARATOR;
+    # "_" допускается float ("1_0" == 10), но в выигрышах это опечатка
+    separators = text.translate(dict.fromkeys(map(ord, set(text) - {";", _CELL_SEPARATOR})))
+    if separators != (";" + _CELL_SEPARATOR) * (rows * cols - 1) + ";" or "_" in text:
+        _raise_invalid_cell(matrix)
+    try:
+        values = np.array(text.replace(";", _CELL_SEPARATOR).split(_CELL_SEPARATOR), dtype=float)
+    except ValueError:
+        _raise_invalid_cell(matrix)
+    # nan и inf разбираются как числа, но ломают минимакс, равновесия и ЛП
+    if not np.isfinite(values).all():
+        _raise_invalid_cell(matrix)
+
+    return values[0::2].reshape(rows, cols), values[1::2].reshape(rows, cols)
+
+def parse_payoff_cell(cell):
+    """
+    Разбирает одну ячейку "(a;b)" и возвращает пару выигрышей (float, float).
+    При некорректном значении (в том числе nan, inf и числах с "_") выбрасывает ValueError.
+    """
+    match = _CELL_PATTERN.fullmatch(cell)
+    if not match or "_" in cell:
+        raise ValueError(f"Некорректное значение ячейки: {cell!r}")
+    payoffs = float(match.group(1).replace(",", ".")), float(match.group(2).replace(",", "."))
+    if not all(map(math.isfinite, payoffs)):
+        raise ValueError(f"Некорректное значение ячейки: {cell!r}")
+    return payoffs
+
+def _raise_invalid_cell(matrix):
+    """
+    Медленный путь только для сообщения об ошибке: ищет первую некорректную ячейку.
+    """
+    cols = len(matrix[0])
+    for i, row in enumerate(matrix):
+        if len(row) != cols:
+            raise ValueError(f"Строка {i + 1} содержит {len(row)} ячеек вместо {cols}.")
+        for j, cell in enumerate(row):
+            try:
+                parse_payoff_cell(cell)
+            except ValueError:
+                raise ValueError(f"Некорректное значение в ячейке ({i + 1}, {j + 1}): {cell!r}") from None
+    raise ValueError("Некорректная матрица выигрышей.")
+
+def format_payoff(value, exact=False):
+    """
+    Форматирует выигрыш для отображения: целые без дробной части, дробные — как есть.
+    Для отображения дробные сокращаются до 6 значащих цифр; exact=True записывает их без потерь
+    (для редактирования ячейки и сохранения в CSV), так что разбор возвращает то же число.
+    """
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    return repr(value) if exact else f"{value:g}"
+
+def maximin_values(player1_matrix, player2_matrix):
+    """
+    Рассчитывает гарантированные (максиминные) выигрыши обоих игроков в чистых стратегиях
+    по уже разобранным массивам выигрышей.
     """
-    player1_matrix, player2_matrix = parse_bimatrix(matrix)
-    
     # Минимакс для первого игрока
     min_in_rows = np.min(player1_matrix, axis=1)
     maximin_p1 = np.max(min_in_rows)
-    
+
     # Минимакс для второго игрока
     min_in_cols = np.min(player2_matrix, axis=0)
     maximin_p2 = np.max(min_in_cols)
-    
+
     return maximin_p1, maximin_p2
 
+def minimax_bimatrix(matrix):
+    """
+    Рассчитывает минимаксную стратегию для обоих игроков в биматричной игре.
+    """
+    player1_matrix, player2_matrix = parse_bimatrix(matrix)
+    return maximin_values(player1_matrix, player2_matrix)
+
+def pure_nash_equilibria(player1_matrix, player2_matrix):
+    """
+    Находит все равновесия Нэша в чистых стратегиях по уже разобранным массивам выигрышей.
+    Лучшие ответы обоих игроков вычисляются за один проход:
+    максимум по столбцам для первого игрока и максимум по строкам для второго.
+    Возвращает массив индексов формы (k, 2), строки упорядочены как (i, j).
+    """
+    player1_matrix = np.asarray(player1_matrix)
+    player2_matrix = np.asarray(player2_matrix)
+
+    # Маски лучших ответов: первый игрок выбирает строку при фиксированном столбце,
+    # второй игрок выбирает столбец при фиксированной строке
+    best_response_p1 = player1_matrix == player1_matrix.max(axis=0, keepdims=True)
+    best_response_p2 = player2_matrix == player2_matrix.max(axis=1, keepdims=True)
+
+    return np.argwhere(best_response_p1 & best_response_p2)
+
 def nash_equilibria(matrix):
     """
     Находит равновесия Нэша в биматричной игре.
     """
     player1_matrix, player2_matrix = parse_bimatrix(matrix)
+    return [(int(i), int(j)) for i, j in pure_nash_equilibria(player1_matrix, player2_matrix)]
+
+def _as_game_stack(player1_matrix, player2_matrix):
+    player1_matrix = np.asarray(player1_matrix)
+    player2_matrix = np.asarray(player2_matrix)
+    if player1_matrix.ndim != 3 or player1_matrix.shape != player2_matrix.shape:
+        raise ValueError("Ожидаются массивы выигрышей одинаковой формы (n_games, rows, cols).")
+    return player1_matrix, player2_matrix
+
+def batch_maximin_values(player1_matrix, player2_matrix):
+    """
+    Максиминные выигрыши в чистых стратегиях для стопки игр формы (n_games, rows, cols).
+    Возвращает два массива длины n_games.
+    """
+    player1_matrix, player2_matrix = _as_game_stack(player1_matrix, player2_matrix)
+    return player1_matrix.min(axis=2).max(axis=1), player2_matrix.min(axis=1).max(axis=1)
+
+def batch_pure_nash_masks(player1_matrix, player2_matrix):
+    """
+    Маски равновесий в чистых стратегиях для стопки игр: элемент [g, i, j] истинен,
+    если (i, j) — равновесие игры g. Например, доля игр с равновесием — masks.any(axis=(1, 2)).mean().
+    """
+    player1_matrix, player2_matrix = _as_game_stack(player1_matrix, player2_matrix)
+    best_response_p1 = player1_matrix == player1_matrix.max(axis=1, keepdims=True)
+    best_response_p2 = player2_matrix == player2_matrix.max(axis=2, keepdims=True)
+    return best_response_p1 & best_response_p2
+
+def _batch_dominated(payoffs, alive, opponents_alive, weak):
+    """
+    Доминируемые строки payoffs (n_games, k, m) среди живых строк alive (n_games, k),
+    сравнения только по живым стратегиям противника opponents_alive (n_games, m).
+    """
+    # [g, i, l, j]: сравнение строки i со строкой l в столбце j
+    ignored = ~opponents_alive[:, None, None, :]
+    candidates = alive[:, None, :] & ~np.eye(payoffs.shape[1], dtype=bool)
+    less = payoffs[:, :, None, :] < payoffs[:, None, :, :]
+    if weak:
+        less_equal = payoffs[:, :, None, :] <= payoffs[:, None, :, :]
+        dominated_by = (less_equal | ignored).all(axis=3) & (less & ~ignored).any(axis=3)
+    else:
+        dominated_by = (less | ignored).all(axis=3)
+    return alive & (dominated_by & candidates).any(axis=2)
+
+def batch_dominance_survivors(player1_matrix, player2_matrix, weak=False):
+    """
+    Итеративное исключение доминируемых стратегий (по умолчанию строго) сразу для стопки игр.
+    Порядок тот же, что в dominance_survivors: в каждом раунде сначала строки, затем столбцы.
+    Возвращает маски оставшихся строк (n_games, rows) и столбцов (n_games, cols).
+    Игры обрабатываются блоками, чтобы промежуточные массивы сравнений оставались в пределах
+    DOMINANCE_BLOCK_ELEMENTS элементов.
+    """
+    player1_matrix, player2_matrix = _as_game_stack(player1_matrix, player2_matrix)
+    games, rows, cols = player1_matrix.shape
+    row_alive = np.ones((games, rows), dtype=bool)
+    col_alive = np.ones((games, cols), dtype=bool)
+    block = max(1, DOMINANCE_BLOCK_ELEMENTS // max(1, rows * cols * max(rows, cols)))
+
+    for start in range(0, games, block):
+        # Индексы игр блока, в которых на прошлом раунде что-то исключили; остальные уже сошлись
+        active = np.arange(start, min(start + block, games))
+        while len(active):
+            payoffs1, payoffs2 = player1_matrix[active], np.swapaxes(player2_matrix[active], 1, 2)
+            dominated_rows = _batch_dominated(payoffs1, row_alive[active], col_alive[active], weak)
+            row_alive[active] &= ~dominated_rows
+            dominated_cols = _batch_dominated(payoffs2, col_alive[active], row_alive[active], weak)
+            col_alive[active] &= ~dominated_cols
+            active = active[dominated_rows.any(axis=1) | dominated_cols.any(axis=1)]
+
+    return row_alive, col_alive
+
+class _SolverBudget:
+    """
+    Лимит итераций и времени решателя. Прерывает работу TimeoutError при исчерпании
+    и сообщает долю израсходованного бюджета в progress, если он задан.
+    """
+    def __init__(self, max_iterations=None, time_limit=None, progress=None):
+        self.max_iterations = max_iterations
+        self.time_limit = time_limit
+        self.progress = progress
+        self.started = time.perf_counter()
+        self.iteration = 0
+
+    def step(self):
+        if self.max_iterations is not None and self.iteration >= self.max_iterations:
+            raise TimeoutError(f"Превышен лимит итераций решателя ({self.max_iterations}).")
+        elapsed = time.perf_counter() - self.started
+        if self.time_limit is not None and elapsed > self.time_limit:
+            raise TimeoutError("Превышен лимит времени решателя.")
+        self.iteration += 1
+
+        if self.progress is not None:
+            fractions = [0.0]
+            if self.max_iterations:
+                fractions.append(self.iteration / self.max_iterations)
+            if self.time_limit:
+                fractions.append(elapsed / self.time_limit)
+            self.progress(min(1.0, max(fractions)))
+
+def _support_enumeration(player1_matrix, player2_matrix, budget, tol):
+    """
+    Перебор носителей одинакового размера (для невырожденных игр этого достаточно).
+    Для каждой пары носителей решаются системы условий безразличия обоих игроков.
+    """
     rows, cols = player1_matrix.shape
     equilibria = []
-    
-    for i in range(rows):
-        for j in range(cols):
-            p1_payoff = player1_matrix[i, j]
-            p2_payoff = player2_matrix[i, j]
-            
-            best_response_p1 = p1_payoff == np.max(player1_matrix[:, j])
-            best_response_p2 = p2_payoff == np.max(player2_matrix[i, :])
-            
-            if best_response_p1 and best_response_p2:
-                equilibria.append((i, j))
-    
-    return equilibria
\ No newline at end of file
+
+    for size in range(1, min(rows, cols) + 1):
+        for support_rows in itertools.combinations(range(rows), size):
+            for support_cols in itertools.combinations(range(cols), size):
+                budget.step()
+
+                # Стратегия второго игрока делает первого безразличным между строками носителя
+                y = _indifferent_strategy(player1_matrix[np.ix_(support_rows, support_cols)], tol)
+                if y is None:
+                    continue
+                # Стратегия первого игрока делает второго безразличным между столбцами носителя
+                x = _indifferent_strategy(player2_matrix[np.ix_(support_rows, support_cols)].T, tol)
+                if x is None:
+                    continue
+
+                x_full = np.zeros(rows)
+                y_full = np.zeros(cols)
+                x_full[list(support_rows)] = x
+                y_full[list(support_cols)] = y
+
+                # Вне носителя не должно быть более выгодных ответов
+                payoffs_p1 = player1_matrix @ y_full
+                payoffs_p2 = x_full @ player2_matrix
+                if payoffs_p1.max() <= payoffs_p1[list(support_rows)].max() + tol and \
+                        payoffs_p2.max() <= payoffs_p2[list(support_cols)].max() + tol:
+                    # В вырожденных играх одно равновесие может найтись на разных носителях
+                    if not any(np.allclose(x_full, x_eq) and np.allclose(y_full, y_eq) for x_eq, y_eq in equilibria):
+                        equilibria.append((x_full, y_full))
+
+    return equilibria
+
+def _indifferent_strategy(payoff_block, tol):
+    """
+    Находит вероятности столбцов блока, при которых все строки блока дают одинаковый выигрыш.
+    Возвращает None, если система вырождена или решение не является распределением.
+    """
+    size = payoff_block.shape[0]
+    system = np.zeros((size + 1, size + 1))
+    system[:size, :size] = payoff_block
+    system[:size, size] = -1.0
+    system[size, :size] = 1.0
+    rhs = np.zeros(size + 1)
+    rhs[size] = 1.0
+
+    try:
+        solution = np.linalg.solve(system, rhs)
+    except np.linalg.LinAlgError:
+        return None
+
+    probabilities = solution[:size]
+    if np.any(probabilities < -tol):
+        return None
+    return np.clip(probabilities, 0.0, None)
+
+def _lexicographic_pivot_row(tableau, column, positive, basis_columns, tol):
+    """
+    Правило минимального отношения с лексикографическим разрешением ничьих.
+    Без него алгоритм Лемке–Хоусона может зациклиться на вырожденных играх.
+    """
+    candidates = np.flatnonzero(positive)
+    ratios = tableau[candidates, -1] / column[candidates]
+    candidates = candidates[ratios <= ratios.min() + tol]
+
+    # При ничьей по правым частям сравниваем по очереди столбцы исходного базиса
+    if len(candidates) > 1:
+        keys = tableau[candidates, basis_columns] / column[candidates, None]
+        for k in range(keys.shape[1]):
+            tied = keys[:, k] <= keys[:, k].min() + tol
+            candidates, keys = candidates[tied], keys[tied]
+            if len(candidates) == 1:
+                break
+    return int(candidates[0])
+
+def _lemke_howson(player1_matrix, player2_matrix, initial_label, budget, tol):
+    """
+    Алгоритм Лемке–Хоусона: комплементарный поворот по двум симплекс-таблицам.
+    Метки 0..rows-1 соответствуют стратегиям первого игрока, rows..rows+cols-1 — второго.
+    """
+    rows, cols = player1_matrix.shape
+
+    # Сдвигаем выигрыши, чтобы они были строго положительными (равновесия не меняются)
+    shift = 1.0 - min(player1_matrix.min(), player2_matrix.min())
+    A = player1_matrix + shift
+    B = player2_matrix + shift
+
+    # Таблица для y: A y + r = 1, переменные r_i имеют метки i, y_j — метки rows + j
+    tableau_q = np.hstack([np.eye(rows), A, np.ones((rows, 1))])
+    basis_q = list(range(rows))
+    # Таблица для x: B^T x + s = 1, переменные x_i имеют метки i, s_j — метки rows + j
+    tableau_p = np.hstack([B.T, np.eye(cols), np.ones((cols, 1))])
+    basis_p = list(range(rows, rows + cols))
+
+    # Столбцы исходного базиса каждой таблицы нужны для лексикографического правила выбора строки
+    columns_q, columns_p = slice(0, rows), slice(rows, rows + cols)
+
+    # Первая входящая метка вводится в ту таблицу, где соответствующая переменная небазисная
+    current, other = (tableau_p, basis_p, columns_p), (tableau_q, basis_q, columns_q)
+    if initial_label >= rows:
+        current, other = other, current
+
+    entering = initial_label
+    while True:
+        budget.step()
+        tableau, basis, basis_columns = current
+
+        column = tableau[:, entering]
+        positive = column > tol
+        if not np.any(positive):
+            raise ValueError("Алгоритм Лемке–Хоусона встретил неограниченное направление.")
+        pivot_row = _lexicographic_pivot_row(tableau, column, positive, basis_columns, tol)
+
+        leaving = basis[pivot_row]
+        pivot = tableau[pivot_row] / tableau[pivot_row, entering]
+        factors = column.copy()
+        factors[pivot_row] = 0.0
+        tableau -= np.outer(factors, pivot)
+        tableau[pivot_row] = pivot
+        basis[pivot_row] = entering
+
+        if leaving == initial_label:
+            break
+
+        # Вышедшая метка становится входящей во второй таблице
+        entering = leaving
+        current, other = other, current
+
+    x = np.zeros(rows)
+    for row, label in enumerate(basis_p):
+        if label < rows:
+            x[label] = tableau_p[row, -1]
+    y = np.zeros(cols)
+    for row, label in enumerate(basis_q):
+        if label >= rows:
+            y[label - rows] = tableau_q[row, -1]
+
+    return x / x.sum(), y / y.sum()
+
+def mixed_nash_equilibria(player1_matrix, player2_matrix, method="support", initial_label=0,
+                          max_iterations=None, time_limit=None, tol=1e-9, progress=None):
+    """
+    Находит равновесия Нэша в смешанных стратегиях.
+    method="support" — перебор носителей, возвращает все равновесия невырожденной игры (для малых игр);
+    method="lemke-howson" — поворотный алгоритм Лемке–Хоусона, быстро находит одно равновесие.
+    max_iterations и time_limit (в секундах) ограничивают работу решателя;
+    при превышении бюджета выбрасывается TimeoutError. progress(доля) получает долю израсходованного бюджета.
+    Возвращает список пар (x, y) вероятностей стратегий первого и второго игрока.
+    """
+    player1_matrix = np.asarray(player1_matrix, dtype=float)
+    player2_matrix = np.asarray(player2_matrix, dtype=float)
+    budget = _SolverBudget(max_iterations, time_limit, progress)
+
+    if method == "support":
+        return _support_enumeration(player1_matrix, player2_matrix, budget, tol)
+    if method == "lemke-howson":
+        rows, cols = player1_matrix.shape
+        if not 0 <= initial_label < rows + cols:
+            raise ValueError(f"Начальная метка должна быть в диапазоне 0..{rows + cols - 1}.")
+        return [_lemke_howson(player1_matrix, player2_matrix, initial_label, budget, tol)]
+    raise ValueError(f"Неизвестный метод: {method}")
+
+# Доля ненулевых выигрышей, ниже которой ЛП строится в разреженном виде без сдвига выигрышей
+LP_SPARSE_DENSITY = 0.1
+# Начиная с этого числа элементов ЛП решается методом внутренней точки, а не симплекс-методом
+LP_IPM_ELEMENTS = 1 << 18
+
+def _load_linprog():
+    """
+    scipy нужен только для смешанных гарантирующих стратегий, поэтому импортируется при первом вызове.
+    """
+    try:
+        from scipy import sparse
+        from scipy.optimize import linprog
+    except ImportError as e:
+        raise RuntimeError("Для расчета смешанных гарантирующих стратегий требуется пакет scipy.") from e
+    return linprog, sparse
+
+def _use_sparse_lp(payoffs, mode):
+    if mode == "dense":
+        return False
+    if mode == "sparse":
+        return True
+    if mode != "auto":
+        raise ValueError(f"Неизвестный режим решателя: {mode}")
+    return np.count_nonzero(payoffs) < LP_SPARSE_DENSITY * payoffs.size
+
+def _pure_saddle_point(payoffs, tol):
+    """
+    Проверяет седловую точку в чистых стратегиях: если максимин строк равен минимаксу столбцов,
+    чистые стратегии уже оптимальны и решать ЛП не нужно.
+    """
+    row_min = payoffs.min(axis=1)
+    col_max = payoffs.max(axis=0)
+    i, j = int(np.argmax(row_min)), int(np.argmin(col_max))
+    if row_min[i] < col_max[j] - tol:
+        return None
+
+    strategy = np.zeros(payoffs.shape[0])
+    opponent = np.zeros(payoffs.shape[1])
+    strategy[i] = opponent[j] = 1.0
+    return strategy, float(row_min[i]), opponent
+
+def security_gap(payoffs, strategy, opponent):
+    """
+    Разрыв двойственности для пары стратегий в матрице выигрышей payoffs (строки — стратегии игрока):
+    разность между наихудшим выигрышем, который гарантирует opponent, и выигрышем, который гарантирует strategy.
+    Нулевой разрыв означает, что обе стратегии оптимальны.
+    """
+    guaranteed = (np.asarray(strategy) @ payoffs).min()
+    conceded = (payoffs @ np.asarray(opponent)).max()
+    return float(conceded - guaranteed)
+
+def _security_lp(payoffs, mode, tol):
+    """
+    Решает ЛП для гарантирующей стратегии методом HiGHS.
+    В плотном виде выигрыши сдвигаются в положительные, и решается min sum(u) при payoffs^T u >= 1, u >= 0:
+    стратегия равна u / sum(u), гарантированный выигрыш — 1 / sum(u) минус сдвиг.
+    В разреженном виде сдвиг испортил бы разреженность, поэтому решается max v при payoffs^T x >= v, sum(x) = 1.
+    Двойственные переменные ограничений дают наихудшую для игрока смешанную стратегию противника.
+    """
+    linprog, sparse = _load_linprog()
+    rows, cols = payoffs.shape
+    method = "highs-ipm" if payoffs.size >= LP_IPM_ELEMENTS else "highs"
+    options = {"primal_feasibility_tolerance": tol, "dual_feasibility_tolerance": tol}
+
+    if _use_sparse_lp(payoffs, mode):
+        objective = np.zeros(rows + 1)
+        objective[-1] = -1.0
+        constraints = sparse.hstack([sparse.csr_matrix(-payoffs.T), np.ones((cols, 1))], format="csr")
+        result = linprog(objective, A_ub=constraints, b_ub=np.zeros(cols),
+                         A_eq=np.append(np.ones(rows), 0.0)[None, :], b_eq=[1.0],
+                         bounds=[(0, None)] * rows + [(None, None)], method=method, options=options)
+        if result.status != 0:
+            raise RuntimeError(f"Решатель ЛП не нашел решение: {result.message}")
+        strategy, value = result.x[:rows], result.x[-1]
+    else:
+        shift = payoffs.min() - 1.0
+        result = linprog(np.ones(rows), A_ub=shift - payoffs.T, b_ub=-np.ones(cols),
+                         bounds=(0, None), method=method, options=options)
+        if result.status != 0:
+            raise RuntimeError(f"Решатель ЛП не нашел решение: {result.message}")
+        strategy, value = result.x, 1.0 / result.x.sum() + shift
+
+    strategy = np.clip(strategy, 0.0, None)
+    opponent = np.clip(-result.ineqlin.marginals, 0.0, None)
+    # Прибавление нуля убирает отрицательный ноль в цене симметричных игр
+    return strategy / strategy.sum(), float(value) + 0.0, opponent / opponent.sum()
+
+def security_strategy(payoffs, mode="auto", warm_start=None, tol=1e-7):
+    """
+    Находит оптимальную смешанную гарантирующую (максиминную) стратегию игрока,
+    строки payoffs — его стратегии, столбцы — стратегии противника.
+    mode="dense" или "sparse" задает вид матрицы ограничений для решателя ЛП, "auto" выбирает по размеру.
+    warm_start — пара (strategy, opponent) из решения похожей игры: если ее разрыв двойственности
+    не больше tol, она возвращается без решения ЛП.
+    Возвращает (strategy, value, opponent): стратегию, гарантированный выигрыш
+    и наихудшую для игрока стратегию противника.
+    """
+    payoffs = np.asarray(payoffs, dtype=float)
+
+    if warm_start is not None:
+        strategy, opponent = warm_start
+        if len(strategy) == payoffs.shape[0] and len(opponent) == payoffs.shape[1] \
+                and security_gap(payoffs, strategy, opponent) <= tol:
+            return strategy, float((strategy @ payoffs).min()), opponent
+
+    saddle = _pure_saddle_point(payoffs, tol)
+    if saddle is not None:
+        return saddle
+    return _security_lp(payoffs, mode, tol)
+
+def security_strategies(player1_matrix, player2_matrix, mode="auto", tol=1e-7):
+    """
+    Смешанные гарантирующие стратегии обоих игроков в биматричной игре.
+    Если игра антагонистическая (player2_matrix == -player1_matrix), решается одна ЛП,
+    и найденные стратегии образуют точное равновесие.
+    Возвращает ((x, value_p1), (y, value_p2)).
+    """
+    player1_matrix = np.asarray(player1_matrix, dtype=float)
+    player2_matrix = np.asarray(player2_matrix, dtype=float)
+
+    if np.array_equal(player2_matrix, -player1_matrix):
+        x, value, y = zero_sum_solution(player1_matrix, mode, tol)
+        return (x, value), (y, 0.0 - value)
+
+    x, value_p1, _ = security_strategy(player1_matrix, mode, tol=tol)
+    y, value_p2, _ = security_strategy(player2_matrix.T, mode, tol=tol)
+    return (x, value_p1), (y, value_p2)
+
+def zero_sum_solution(player1_matrix, mode="auto", tol=1e-7):
+    """
+    Точное решение антагонистической игры: оптимальные стратегии обоих игроков и цена игры
+    для первого игрока. Стратегия второго игрока берется из двойственных переменных той же ЛП.
+    """
+    return security_strategy(player1_matrix, mode, tol=tol)
+
+class SecuritySolver:
+    """
+    Решатель гарантирующих стратегий для серии похожих игр одного размера.
+    Запоминает последнее решение каждого игрока и сначала проверяет его разрыв двойственности
+    на новой игре; ЛП решается только если прежние стратегии перестали быть оптимальными.
+    """
+    def __init__(self, mode="auto", tol=1e-7):
+        self.mode = mode
+        self.tol = tol
+        self.previous = [None, None]
+        self.reused = 0
+        self.solved = 0
+
+    def _solve(self, player, payoffs):
+        warm_start = self.previous[player]
+        strategy, value, opponent = security_strategy(payoffs, self.mode, warm_start, self.tol)
+        if warm_start is not None and strategy is warm_start[0]:
+            self.reused += 1
+        else:
+            self.solved += 1
+        self.previous[player] = (strategy, opponent)
+        return strategy, value
+
+    def solve(self, player1_matrix, player2_matrix):
+        """
+        То же, что security_strategies, но с повторным использованием прежних решений.
+        """
+        player1_matrix = np.asarray(player1_matrix, dtype=float)
+        player2_matrix = np.asarray(player2_matrix, dtype=float)
+        return self._solve(0, player1_matrix), self._solve(1, player2_matrix.T)
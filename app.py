@@ -1,9 +1,35 @@
+import importlib
 import sys
+import threading
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+from auth import restore_session
 from login_window import LoginWindow
 
+def preload_main_window():
+    """
+    Загружает главное окно, NumPy и решатели в фоновом потоке, пока пользователь вводит пароль.
+    Если вход произойдет раньше, импорт в потоке интерфейса дождется окончания загрузки.
+    """
+    threading.Thread(target=importlib.import_module, args=("main_window",), daemon=True).start()
+
+def restore_or_preload(window):
+    """
+    Вызывается после показа окна авторизации: открывает главное окно по сохраненному входу
+    или начинает загружать его в фоне. Обращение к базе и импорт главного окна
+    не задерживают появление первого окна.
+    """
+    window.setEnabled(False)
+    username = restore_session()
+    if username:
+        window.open_main_window(username)
+        return
+    window.setEnabled(True)
+    preload_main_window()
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
-    login_window = LoginWindow()
-    login_window.show()
+    window = LoginWindow()
+    window.show()
+    QTimer.singleShot(0, lambda: restore_or_preload(window))
     sys.exit(app.exec())
@@ -1,19 +1,101 @@
-from database import get_db_connection
+from database import get_connection, transaction
 from utils import hash_password
+import os
+import secrets
 import sqlite3
+import time
 
-conn, cursor = get_db_connection()
+# Каталог приложения в настройках пользователя
+APP_NAME = "Modelling"
+SESSION_LIFETIME_DAYS = 30
+
+def _config_dir():
+    """
+    Каталог настроек текущего пользователя ОС: %APPDATA% в Windows, иначе $XDG_CONFIG_HOME или ~/.config.
+    Токен не хранится в рабочем каталоге: на общих установках следующий пользователь,
+    запустивший приложение из того же каталога, вошел бы под чужой учетной записью.
+    """
+    if os.name == "nt" and os.environ.get("APPDATA"):
+        base = os.environ["APPDATA"]
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, APP_NAME)
+
+# Файл с токеном сохраненного входа
+SESSION_FILE = os.path.join(_config_dir(), "session.token")
 
 def register_user(username, password):
     try:
-        cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", 
-                       (username, hash_password(password)))
-        conn.commit()
+        with transaction() as cursor:
+            cursor.execute("INSERT INTO users (username, password) VALUES (?, ?)", 
+                           (username, hash_password(password)))
         return True
     except sqlite3.IntegrityError:
         return False
 
 def validate_user(username, password):
-    cursor.execute("SELECT password FROM users WHERE username = ?", (username,))
-    row = cursor.fetchone()
+    row = get_connection().execute("SELECT password FROM users WHERE username = ?", (username,)).fetchone()
     return row and row[0] == hash_password(password)
+
+def create_session(username, lifetime_days=SESSION_LIFETIME_DAYS):
+    """
+    Создает сессию пользователя и возвращает ее токен. В базе хранится только хеш токена.
+    """
+    token = secrets.token_urlsafe(32)
+    with transaction() as cursor:
+        # Заодно удаляем просроченные сессии
+        cursor.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),))
+        cursor.execute("INSERT INTO sessions (token_hash, username, expires_at) VALUES (?, ?, ?)",
+                       (hash_password(token), username, time.time() + lifetime_days * 86400))
+    return token
+
+def validate_session(token):
+    """
+    Возвращает имя пользователя для действующего токена или None.
+    """
+    row = get_connection().execute("SELECT username, expires_at FROM sessions WHERE token_hash = ?",
+                                   (hash_password(token),)).fetchone()
+    if row and row[1] >= time.time():
+        return row[0]
+    return None
+
+def revoke_session(token):
+    with transaction() as cursor:
+        cursor.execute("DELETE FROM sessions WHERE token_hash = ?", (hash_password(token),))
+
+def save_session_token(token, path=SESSION_FILE):
+    # Каталог и файл доступны только владельцу; права файла задаются и в том случае, если он уже был
+    os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.chmod(path, 0o600)
+    with os.fdopen(fd, "w") as f:
+        f.write(token)
+
+def load_session_token(path=SESSION_FILE):
+    try:
+        with open(path) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def restore_session(path=SESSION_FILE):
+    """
+    Проверяет сохраненный токен и возвращает имя пользователя, чтобы войти без пароля.
+    Недействительный токен удаляется.
+    """
+    token = load_session_token(path)
+    if token is None:
+        return None
+    username = validate_session(token)
+    if username is None:
+        os.remove(path)
+    return username
+
+def forget_session(path=SESSION_FILE):
+    """
+    Завершает сохраненный вход: удаляет сессию из базы и файл с токеном.
+    """
+    token = load_session_token(path)
+    if token is not None:
+        revoke_session(token)
+        os.remove(path)
@@ -0,0 +1,277 @@
+"""
+Пакетный анализ биматричных игр без графического интерфейса.
+
+Читает игры из CSV-файлов (ячейки "(a;b)", как их сохраняет приложение) и/или
+из users.db (таблица games и CSV-данные пользователей), либо генерирует случайные игры
+(модуль generators — для нагрузочной проверки решателей), распределяет их по процессам и
+построчно выводит результаты в формате JSON Lines или CSV.
+
+Примеры:
+    python batch.py --csv games/*.csv --output results.jsonl
+    python batch.py --db users.db --format csv --ops minimax nash
+    python batch.py --csv games/ --workers 32 --chunk-size 200 > results.jsonl
+    python batch.py --csv games/*.csv --ops minimax security
+    python batch.py --generate potential 1000000 4 4 --seed 1 --ops nash > stress.jsonl
+    python batch.py --db users.db --cache --ops weak strict security
+
+С ключом --cache результаты берутся из кэша результатов (result_cache, по умолчанию results.db
+рядом с users.db) и записываются в него; этот же кэш использует приложение.
+"""
+import argparse
+import collections
+import csv
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import database
+from Functions import maximin_values, pure_nash_equilibria, dominance_survivors, SecuritySolver
+from storage import decode_payoffs, csv_to_matrices, load_csv_streaming
+from generators import GAME_FAMILIES, iter_games
+from result_cache import ResultCache, CACHE_PATH, game_digest, operation_name
+
+OPERATIONS = ("minimax", "nash", "weak", "strict", "security")
+# Смешанные гарантирующие стратегии требуют решения ЛП (и scipy), поэтому включаются только явно
+DEFAULT_OPERATIONS = ("minimax", "nash", "weak", "strict")
+# Имена операций в кэше результатов (общие с интерфейсом); для security к имени добавляются настройки решателя
+CACHE_OPERATIONS = {"minimax": "maximin", "nash": "nash", "weak": "weak-dom", "strict": "strict-dom",
+                    "security": "security"}
+CSV_FIELDS = ["id", "rows", "cols", "maximin_p1", "maximin_p2", "nash",
+              "weak_rows", "weak_cols", "strict_rows", "strict_cols",
+              "security_p1", "security_p2", "security_x", "security_y", "error"]
+
+def iter_csv_games(paths):
+    """
+    Перечисляет CSV-файлы: пути, шаблоны glob и каталоги (берутся все *.csv внутри).
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            matches = sorted(glob.glob(os.path.join(path, "**", "*.csv"), recursive=True))
+        else:
+            matches = sorted(glob.glob(path)) or [path]
+        for match in matches:
+            yield match, ("file", match)
+
+# Сколько записей читается из базы одним запросом
+DB_FETCH_ROWS = 16
+
+def _iter_table(conn, query):
+    """
+    Читает таблицу короткими запросами по DB_FETCH_ROWS записей, продолжая с последнего id.
+    Курсор не остается открытым между пачками, поэтому снимок чтения WAL не удерживается
+    на весь пакет, и записи приложения могут переноситься в базу (checkpoint) во время долгого расчета.
+    """
+    last_id = -1
+    while True:
+        rows = conn.execute(query, (last_id, DB_FETCH_ROWS)).fetchall()
+        yield from rows
+        if len(rows) < DB_FETCH_ROWS:
+            return
+        last_id = rows[-1][0]
+
+def iter_db_games(db_path):
+    """
+    Перечисляет игры из базы данных: двоичные игры из таблицы games
+    и CSV-данные пользователей прежнего формата из таблицы users.
+    """
+    conn = database.get_connection(db_path)
+
+    games = _iter_table(conn, "SELECT id, username, dtype, rows, cols, player1, player2 FROM games "
+                              "WHERE id > ? ORDER BY id LIMIT ?")
+    for game_id, username, dtype, rows, cols, player1_blob, player2_blob in games:
+        yield f"game:{game_id}:{username}", ("game", (dtype, rows, cols, player1_blob, player2_blob))
+
+    users = _iter_table(conn, "SELECT id, username, csv_file FROM users "
+                              "WHERE csv_file IS NOT NULL AND id > ? ORDER BY id LIMIT ?")
+    for _, username, csv_data in users:
+        yield f"db:{username}", ("blob", bytes(csv_data))
+
+def iter_generated_games(family, count, rows, cols, seed=None):
+    """
+    Перечисляет случайные игры семейства family; номер игры входит в ее идентификатор.
+    """
+    index = 0
+    for player1_stack, player2_stack in iter_games(count, rows, cols, family, seed):
+        for player1_matrix, player2_matrix in zip(player1_stack, player2_stack):
+            yield f"{family}:{index}", ("arrays", (player1_matrix, player2_matrix))
+            index += 1
+
+# Кэш результатов рабочего процесса: создается при первой пачке и переиспользуется
+_process_cache = None
+
+def _get_process_cache(path):
+    global _process_cache
+    if _process_cache is None or _process_cache.path != path:
+        _process_cache = ResultCache(path)
+    return _process_cache
+
+def analyse_game(game_id, source, operations, solver=None, cache=None):
+    """
+    Выполняет выбранные операции для одной игры. Ошибки не прерывают пакет,
+    а попадают в поле error результата.
+    solver — SecuritySolver, общий для пачки игр, чтобы решения похожих игр использовались повторно.
+    cache — ResultCache; если задан, результаты операций берутся из него и сохраняются в него.
+    """
+    result = {"id": game_id}
+    try:
+        kind, payload = source
+        if kind == "game":
+            player1_matrix, player2_matrix = decode_payoffs(*payload)
+        elif kind == "blob":
+            player1_matrix, player2_matrix = csv_to_matrices(payload)
+        elif kind == "arrays":
+            player1_matrix, player2_matrix = payload
+        else:
+            player1_matrix, player2_matrix = load_csv_streaming(payload)
+        result["rows"], result["cols"] = player1_matrix.shape
+
+        solver = solver or SecuritySolver()
+
+        def compute_security():
+            (x, value_p1), (y, value_p2) = solver.solve(player1_matrix, player2_matrix)
+            return x, value_p1, y, value_p2
+
+        computations = {
+            "minimax": lambda: maximin_values(player1_matrix, player2_matrix),
+            "nash": lambda: (pure_nash_equilibria(player1_matrix, player2_matrix),),
+            "weak": lambda: dominance_survivors(player1_matrix, player2_matrix, weak=True),
+            "strict": lambda: dominance_survivors(player1_matrix, player2_matrix, weak=False),
+            "security": compute_security,
+        }
+        # Игра хешируется один раз для всех операций
+        digest = None
+        if cache is not None and player1_matrix.size >= cache.min_elements:
+            digest = game_digest(player1_matrix, player2_matrix)
+
+        def run(operation):
+            compute = computations[operation]
+            if cache is None:
+                return compute()
+            name = CACHE_OPERATIONS[operation]
+            if operation == "security":
+                name = operation_name(name, solver.mode, solver.tol)
+            return cache.cached(name, player1_matrix, player2_matrix, compute, digest)
+
+        if "minimax" in operations:
+            maximin_p1, maximin_p2 = run("minimax")
+            result["maximin_p1"], result["maximin_p2"] = float(maximin_p1), float(maximin_p2)
+        if "nash" in operations:
+            result["nash"] = run("nash")[0].tolist()
+        for operation in ("weak", "strict"):
+            if operation in operations:
+                rows, cols = run(operation)
+                result[f"{operation}_rows"], result[f"{operation}_cols"] = rows.tolist(), cols.tolist()
+        if "security" in operations:
+            x, value_p1, y, value_p2 = run("security")
+            result["security_p1"], result["security_p2"] = float(value_p1), float(value_p2)
+            result["security_x"], result["security_y"] = x.tolist(), y.tolist()
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+def analyse_chunk(chunk, operations, cache_path=None):
+    """
+    Обрабатывает пачку игр в одном процессе, чтобы уменьшить накладные расходы на передачу задач.
+    cache_path — файл кэша результатов (None — без кэша).
+    """
+    solver = SecuritySolver() if "security" in operations else None
+    cache = _get_process_cache(cache_path) if cache_path else None
+    return [analyse_game(game_id, source, operations, solver, cache) for game_id, source in chunk]
+
+def iter_chunks(games, chunk_size):
+    chunk = []
+    for game in games:
+        chunk.append(game)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def run_batch(games, operations, workers=None, chunk_size=100, cache_path=None):
+    """
+    Анализирует игры в пуле процессов и возвращает результаты по мере готовности, сохраняя порядок.
+    В работе одновременно держится ограниченное число пачек, поэтому входные данные
+    читаются лениво и память не растет с размером корпуса.
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = iter_chunks(games, chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(executor.submit(analyse_chunk, chunk, operations, cache_path))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def write_results(results, output, fmt):
+    """
+    Построчно записывает результаты в формате JSON Lines или CSV. Возвращает (всего, с ошибками).
+    """
+    total = failed = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+        writer.writeheader()
+    for result in results:
+        total += 1
+        failed += "error" in result
+        if fmt == "csv":
+            writer.writerow({key: json.dumps(value) if isinstance(value, list) else value
+                             for key, value in result.items()})
+        else:
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+    return total, failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--csv", nargs="+", default=[], metavar="PATH",
+                        help="CSV-файлы, шаблоны или каталоги с играми")
+    parser.add_argument("--db", metavar="PATH", help="база данных SQLite с сохраненными играми пользователей")
+    parser.add_argument("--generate", nargs=4, metavar=("FAMILY", "COUNT", "ROWS", "COLS"),
+                        help=f"случайные игры семейства ({', '.join(GAME_FAMILIES)})")
+    parser.add_argument("--seed", type=int, help="seed генератора для --generate")
+    parser.add_argument("--ops", nargs="+", choices=OPERATIONS, default=list(DEFAULT_OPERATIONS),
+                        help="выполняемые операции (по умолчанию все, кроме security)")
+    parser.add_argument("--format", choices=("jsonl", "csv"), default="jsonl")
+    parser.add_argument("--output", "-o", help="файл результатов (по умолчанию stdout)")
+    parser.add_argument("--workers", type=int, help="число процессов (по умолчанию число ядер)")
+    parser.add_argument("--chunk-size", type=int, default=100, help="игр в одной задаче для процесса")
+    parser.add_argument("--cache", nargs="?", const=CACHE_PATH, metavar="PATH",
+                        help=f"файл кэша результатов (без PATH — {CACHE_PATH}, общий с приложением)")
+    args = parser.parse_args(argv)
+
+    if not args.csv and not args.db and not args.generate:
+        parser.error("укажите хотя бы один источник: --csv, --db или --generate")
+    if args.generate:
+        family, *sizes = args.generate
+        if family not in GAME_FAMILIES:
+            parser.error(f"неизвестное семейство игр: {family}")
+        try:
+            count, rows, cols = map(int, sizes)
+        except ValueError:
+            parser.error("COUNT, ROWS и COLS в --generate должны быть целыми числами")
+
+    def games():
+        yield from iter_csv_games(args.csv)
+        if args.db:
+            yield from iter_db_games(args.db)
+        if args.generate:
+            yield from iter_generated_games(family, count, rows, cols, args.seed)
+
+    output = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+    try:
+        results = run_batch(games(), tuple(args.ops), args.workers, args.chunk_size, args.cache)
+        total, failed = write_results(results, output, args.format)
+    finally:
+        if args.output:
+            output.close()
+
+    print(f"Обработано игр: {total}, с ошибками: {failed}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
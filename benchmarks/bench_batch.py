@@ -0,0 +1,71 @@
+"""
+Сравнение пропускной способности пакетных функций (стопка игр за один вызов)
+с обработкой тех же игр по одной. Заодно оценивается доля случайных игр
+с равновесием в чистых стратегиях. Результаты пакетного расчета сверяются
+с расчетом по одной на играх, которые считались по одной.
+
+Запуск из корня проекта:
+    python benchmarks/bench_batch.py
+    python benchmarks/bench_batch.py --games 1000000 --loop-games 20000 --sizes 2 4 6
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Functions import maximin_values, pure_nash_equilibria, dominance_survivors, \
+    batch_maximin_values, batch_pure_nash_masks, batch_dominance_survivors
+from generators import generate_game
+
+DEFAULT_SIZES = [2, 3, 4, 6]
+
+def analyse_loop(player1_stack, player2_stack):
+    return [(maximin_values(player1_matrix, player2_matrix),
+             pure_nash_equilibria(player1_matrix, player2_matrix),
+             dominance_survivors(player1_matrix, player2_matrix, weak=False))
+            for player1_matrix, player2_matrix in zip(player1_stack, player2_stack)]
+
+def analyse_batch(player1_stack, player2_stack):
+    return (batch_maximin_values(player1_stack, player2_stack),
+            batch_pure_nash_masks(player1_stack, player2_stack),
+            batch_dominance_survivors(player1_stack, player2_stack, weak=False))
+
+def check_results(loop, batch):
+    """Сверяет пакетные результаты с расчетом по одной для первых len(loop) игр"""
+    (maximin_p1, maximin_p2), masks, (row_alive, col_alive) = batch
+    for game, (maximin, equilibria, (rows, cols)) in enumerate(loop):
+        assert maximin == (maximin_p1[game], maximin_p2[game]), "минимакс не совпадает"
+        assert equilibria.tolist() == [list(eq) for eq in zip(*masks[game].nonzero())], "равновесия не совпадают"
+        assert list(rows) == row_alive[game].nonzero()[0].tolist(), "доминирование строк не совпадает"
+        assert list(cols) == col_alive[game].nonzero()[0].tolist(), "доминирование столбцов не совпадает"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--games", type=int, default=200000, help="игр для пакетного расчета")
+    parser.add_argument("--loop-games", type=int, default=5000, help="игр для расчета по одной")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'размер':>7} {'по одной, игр/с':>16} {'пакетом, игр/с':>15} {'ускорение':>10} {'доля с равновесием':>19}")
+    for size in args.sizes:
+        player1_stack, player2_stack = generate_game(size, size, seed=args.seed, count=args.games)
+
+        start = time.perf_counter()
+        loop = analyse_loop(player1_stack[:args.loop_games], player2_stack[:args.loop_games])
+        loop_rate = args.loop_games / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batch = analyse_batch(player1_stack, player2_stack)
+        batch_rate = args.games / (time.perf_counter() - start)
+        check_results(loop, batch)
+
+        masks = batch[1]
+
+        share = masks.any(axis=(1, 2)).mean()
+        print(f"{size:>3}x{size:<3} {loop_rate:16.0f} {batch_rate:15.0f} {batch_rate / loop_rate:9.0f}x {share:19.4f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Сравнение итеративного исключения доминируемых стратегий на масках индексов
+с исходной реализацией на вложенных циклах и np.delete.
+
+Запуск из корня проекта:
+    python benchmarks/bench_dominance.py
+    python benchmarks/bench_dominance.py --sizes 100 300 --strict --loop-limit 100
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Functions import dominance_survivors
+
+DEFAULT_SIZES = [100, 250, 500, 1000]
+
+def remove_dominated_loop(player1_matrix, player2_matrix, weak=True):
+    """
+    Исходный алгоритм: попарные сравнения в циклах Python и копирование матриц на каждом проходе.
+    """
+    while True:
+        removed = False
+
+        dominated_rows = set()
+        for i in range(player1_matrix.shape[0]):
+            for k in range(player1_matrix.shape[0]):
+                if i != k:
+                    if weak:
+                        if np.all(player1_matrix[i, :] <= player1_matrix[k, :]) and np.any(player1_matrix[i, :] < player1_matrix[k, :]):
+                            dominated_rows.add(i)
+                    else:
+                        if np.all(player1_matrix[i, :] < player1_matrix[k, :]):
+                            dominated_rows.add(i)
+
+        if dominated_rows:
+            player1_matrix = np.delete(player1_matrix, list(dominated_rows), axis=0)
+            player2_matrix = np.delete(player2_matrix, list(dominated_rows), axis=0)
+            removed = True
+
+        dominated_cols = set()
+        for j in range(player2_matrix.shape[1]):
+            for m in range(player2_matrix.shape[1]):
+                if j != m:
+                    if weak:
+                        if np.all(player2_matrix[:, j] <= player2_matrix[:, m]) and np.any(player2_matrix[:, j] < player2_matrix[:, m]):
+                            dominated_cols.add(j)
+                    else:
+                        if np.all(player2_matrix[:, j] < player2_matrix[:, m]):
+                            dominated_cols.add(j)
+
+        if dominated_cols:
+            player1_matrix = np.delete(player1_matrix, list(dominated_cols), axis=1)
+            player2_matrix = np.delete(player2_matrix, list(dominated_cols), axis=1)
+            removed = True
+
+        if not removed:
+            break
+
+    return player1_matrix, player2_matrix
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--strict", action="store_true", help="строгое доминирование вместо слабого")
+    parser.add_argument("--loop-limit", type=int, default=100,
+                        help="наибольший размер, для которого запускается исходный цикл")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    weak = not args.strict
+    rng = np.random.default_rng(args.seed)
+    print(f"{'размер':>10} {'цикл, с':>12} {'маски, с':>12} {'ускорение':>10} {'осталось':>12}")
+
+    for size in args.sizes:
+        # Возрастающая по строкам и столбцам составляющая гарантирует несколько раундов исключения
+        trend = np.add.outer(np.arange(size), np.arange(size)) * 0.01
+        player1_matrix = rng.random((size, size)) + trend
+        player2_matrix = rng.random((size, size)) + trend
+
+        start = time.perf_counter()
+        rows, cols = dominance_survivors(player1_matrix, player2_matrix, weak)
+        fast_time = time.perf_counter() - start
+
+        if size <= args.loop_limit:
+            start = time.perf_counter()
+            reduced1, _ = remove_dominated_loop(player1_matrix, player2_matrix, weak)
+            loop_time = time.perf_counter() - start
+            assert np.array_equal(reduced1, player1_matrix[np.ix_(rows, cols)]), "результаты не совпадают"
+            loop_str = f"{loop_time:12.4f}"
+            speedup_str = f"{loop_time / fast_time:10.0f}x"
+        else:
+            loop_str = f"{'—':>12}"
+            speedup_str = f"{'—':>10}"
+
+        print(f"{size:>4}x{size:<5} {loop_str} {fast_time:12.4f} {speedup_str} {len(rows):>5}x{len(cols):<6}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Сравнение векторизованного поиска равновесий Нэша в чистых стратегиях
+с исходным поэлементным циклом.
+
+Запуск из корня проекта:
+    python benchmarks/bench_nash.py
+    python benchmarks/bench_nash.py --sizes 6 100 500 --loop-limit 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Functions import pure_nash_equilibria
+
+DEFAULT_SIZES = [6, 10, 50, 100, 250, 500, 1000, 2000]
+
+def nash_equilibria_loop(player1_matrix, player2_matrix):
+    """
+    Исходный алгоритм: для каждой клетки заново просматриваются столбец и строка.
+    """
+    rows, cols = player1_matrix.shape
+    equilibria = []
+
+    for i in range(rows):
+        for j in range(cols):
+            best_response_p1 = player1_matrix[i, j] == np.max(player1_matrix[:, j])
+            best_response_p2 = player2_matrix[i, j] == np.max(player2_matrix[i, :])
+
+            if best_response_p1 and best_response_p2:
+                equilibria.append((i, j))
+
+    return equilibria
+
+def best_time(func, repeat):
+    """
+    Возвращает лучшее время из нескольких запусков и результат последнего.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--loop-limit", type=int, default=500,
+                        help="наибольший размер, для которого запускается исходный цикл")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'размер':>10} {'цикл, с':>12} {'numpy, с':>12} {'ускорение':>10} {'равновесий':>11}")
+
+    for size in args.sizes:
+        # Небольшой диапазон выигрышей даёт много совпадений и, значит, равновесий
+        player1_matrix = rng.integers(1, 11, size=(size, size)).astype(float)
+        player2_matrix = rng.integers(1, 11, size=(size, size)).astype(float)
+
+        fast_time, fast = best_time(lambda: pure_nash_equilibria(player1_matrix, player2_matrix), args.repeat)
+
+        if size <= args.loop_limit:
+            loop_time, loop = best_time(lambda: nash_equilibria_loop(player1_matrix, player2_matrix), 1)
+            assert loop == [tuple(eq) for eq in fast.tolist()], "результаты не совпадают"
+            loop_str = f"{loop_time:12.4f}"
+            speedup_str = f"{loop_time / fast_time:10.0f}x"
+        else:
+            loop_str = f"{'—':>12}"
+            speedup_str = f"{'—':>10}"
+
+        print(f"{size:>4}x{size:<5} {loop_str} {fast_time:12.5f} {speedup_str} {len(fast):>11}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Набор замеров для основных функций Functions.py: разбор таблицы, минимакс,
+равновесия Нэша и исключение доминируемых стратегий (слабое и строгое).
+
+Каждая функция запускается на матрицах нескольких размеров и распределений
+выигрышей, включая вырожденные случаи (все выигрыши равны, много совпадений).
+Для каждого запуска записываются время (минимум и медиана по повторам), прирост пиковой
+памяти во время вызова и число блоков и байт, оставшихся выделенными после него, по tracemalloc
+(без содержимого кэша разбора). Число и общий объем выделений за вызов tracemalloc не дает,
+поэтому они не измеряются. Результат сохраняется в JSON, чтобы сравнивать версии между собой.
+PyQt не используется.
+
+Запуск из корня проекта:
+    python benchmarks/bench_suite.py -o bench.json
+    python benchmarks/bench_suite.py --sizes 10 100 --functions nash minimax
+    python benchmarks/bench_suite.py -o new.json --compare bench.json --threshold 1.5
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import Functions
+from Functions import format_payoff
+
+DEFAULT_SIZES = [10, 100, 300]
+
+# Описание метрик памяти, записывается в JSON вместе с результатами
+MEMORY_METRICS = {
+    "peak_bytes": "прирост пиковой памяти (tracemalloc) во время вызова",
+    "retained_blocks": "сколько блоков памяти осталось выделено после вызова, без кэша разбора",
+    "retained_bytes": "сколько байт осталось выделено после вызова, без кэша разбора",
+    "allocations": "число и общий объем выделений за вызов не измеряются",
+}
+
+clear_parse_cache = Functions.parse_bimatrix.cache_clear
+
+def _uniform_int(rng, size):
+    return rng.integers(1, 11, (size, size)), rng.integers(1, 11, (size, size))
+
+def _uniform_float(rng, size):
+    return np.round(rng.random((size, size)) * 100, 2), np.round(rng.random((size, size)) * 100, 2)
+
+def _zero_sum(rng, size):
+    player1_matrix = rng.integers(-10, 11, (size, size))
+    return player1_matrix, -player1_matrix
+
+def _dominance_chain(rng, size):
+    # Возрастающая составляющая дает много раундов исключения
+    trend = np.add.outer(np.arange(size), np.arange(size))
+    return rng.integers(0, 3, (size, size)) + trend, rng.integers(0, 3, (size, size)) + trend
+
+def _all_equal(rng, size):
+    return np.ones((size, size), dtype=int), np.ones((size, size), dtype=int)
+
+def _many_ties(rng, size):
+    return rng.integers(0, 2, (size, size)), rng.integers(0, 2, (size, size))
+
+DISTRIBUTIONS = {
+    "uniform-int": _uniform_int,
+    "uniform-float": _uniform_float,
+    "zero-sum": _zero_sum,
+    "dominance-chain": _dominance_chain,
+    "all-equal": _all_equal,
+    "many-ties": _many_ties,
+}
+
+FUNCTIONS = {
+    "parse": lambda table: Functions.parse_bimatrix(table),
+    "minimax": lambda table: Functions.minimax_bimatrix(table),
+    "nash": lambda table: Functions.nash_equilibria(table),
+    "dominance-weak": lambda table: Functions.remove_dominated_strategies(table, weak=True),
+    "dominance-strict": lambda table: Functions.remove_dominated_strategies(table, weak=False),
+}
+
+def make_table(player1_matrix, player2_matrix):
+    """
+    Строит строковую таблицу "(a;b)" в том виде, в каком ее передает интерфейс.
+    """
+    return [
+        [f"({format_payoff(a)};{format_payoff(b)})" for a, b in zip(row1, row2)]
+        for row1, row2 in zip(player1_matrix.tolist(), player2_matrix.tolist())
+    ]
+
+def run_case(func, table, repeats):
+    """
+    Замеряет одну функцию на одной таблице.
+    Кэш разбора очищается перед каждым вызовом, поэтому время всегда включает разбор.
+    """
+    times = []
+    for _ in range(repeats):
+        clear_parse_cache()
+        start = time.perf_counter()
+        func(table)
+        times.append(time.perf_counter() - start)
+
+    # Память измеряется отдельным запуском: tracemalloc заметно замедляет выполнение
+    clear_parse_cache()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    result = func(table)
+    _, peak = tracemalloc.get_traced_memory()
+    # Кэш разбора заполняется во время вызова, но его содержимое не относится к замеряемой функции
+    clear_parse_cache()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    # Сам снимок before тоже занимает память; она не должна попадать в разницу
+    exclude = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    diff = after.filter_traces(exclude).compare_to(before.filter_traces(exclude), "filename")
+    return {
+        "time_min": min(times),
+        "time_median": statistics.median(times),
+        "repeats": repeats,
+        "peak_bytes": peak - start,
+        "retained_blocks": sum(stat.count_diff for stat in diff),
+        "retained_bytes": sum(stat.size_diff for stat in diff),
+        "result_size": _result_size(result),
+    }
+
+def _result_size(result):
+    """
+    Краткая характеристика результата для проверки, что версии считают одно и то же.
+    """
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, tuple) and result and isinstance(result[0], np.ndarray):
+        return list(result[0].shape)
+    return None
+
+def environment():
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "revision": revision,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+def compare(results, baseline_path, threshold):
+    """
+    Печатает случаи, которые стали медленнее или требуют больше памяти, чем в сохраненном прогоне.
+    Возвращает число найденных регрессий.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["function"], r["distribution"], r["size"]): r for r in json.load(f)["results"]}
+
+    regressions = 0
+    for record in results:
+        old = baseline.get((record["function"], record["distribution"], record["size"]))
+        if old is None:
+            continue
+        for metric in ("time_min", "peak_bytes"):
+            if old[metric] > 0 and record[metric] / old[metric] > threshold:
+                regressions += 1
+                print(f"РЕГРЕССИЯ {record['function']} {record['distribution']} {record['size']}: "
+                      f"{metric} {old[metric]:.6g} -> {record[metric]:.6g}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--functions", nargs="+", choices=list(FUNCTIONS), default=list(FUNCTIONS))
+    parser.add_argument("--distributions", nargs="+", choices=list(DISTRIBUTIONS), default=list(DISTRIBUTIONS))
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="файл JSON с результатами")
+    parser.add_argument("--compare", help="JSON предыдущего прогона для поиска регрессий")
+    parser.add_argument("--threshold", type=float, default=1.5,
+                        help="во сколько раз метрика должна вырасти, чтобы считаться регрессией")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'функция':<17} {'распределение':<16} {'размер':>7} {'мин, с':>10} {'медиана, с':>11} "
+          f"{'пик, КБ':>10} {'осталось блоков':>17}")
+
+    for distribution in args.distributions:
+        for size in args.sizes:
+            rng = np.random.default_rng(args.seed)
+            table = make_table(*DISTRIBUTIONS[distribution](rng, size))
+            for name in args.functions:
+                record = {"function": name, "distribution": distribution, "size": size}
+                record.update(run_case(FUNCTIONS[name], table, args.repeats))
+                results.append(record)
+                print(f"{name:<17} {distribution:<16} {size:>7} {record['time_min']:10.5f} "
+                      f"{record['time_median']:11.5f} {record['peak_bytes'] / 1024:10.1f} "
+                      f"{record['retained_blocks']:>17}")
+
+    assert "PyQt6" not in sys.modules, "набор замеров не должен загружать PyQt"
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"environment": environment(), "memory_metrics": MEMORY_METRICS, "results": results}, f, ensure_ascii=False, indent=2)
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,122 @@
 import sqlite3
+import threading
+import os
+from contextlib import contextmanager
 
-def get_db_connection():
-    conn = sqlite3.connect("users.db")
-    cursor = conn.cursor()
-    
+# Путь к базе данных по умолчанию
+DB_PATH = "users.db"
+
+# Настройки подключения: WAL позволяет читателям работать параллельно с писателем,
+# busy_timeout заставляет ждать освобождения блокировки вместо ошибки "database is locked"
+BUSY_TIMEOUT_MS = 30000
+PRAGMAS = (
+    ("busy_timeout", BUSY_TIMEOUT_MS),
+    ("synchronous", "NORMAL"),
+    ("temp_store", "MEMORY"),
+    ("cache_size", -16000),
+)
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+_schema_ready = set()
+
+def _create_schema(cursor):
     # Создаем таблицу, если она не существует
     cursor.execute('''CREATE TABLE IF NOT EXISTS users (
                       id INTEGER PRIMARY KEY AUTOINCREMENT,
                       username TEXT UNIQUE,
                       password TEXT,
                       csv_file BLOB)''')
-    conn.commit()
-    return conn, cursor
+
+    # Игры пользователей: выигрыши хранятся как сырые буферы с формой и типом в отдельных столбцах
+    cursor.execute('''CREATE TABLE IF NOT EXISTS games (
+                      id INTEGER PRIMARY KEY AUTOINCREMENT,
+                      username TEXT NOT NULL,
+                      created_at REAL NOT NULL,
+                      rows INTEGER NOT NULL,
+                      cols INTEGER NOT NULL,
+                      dtype TEXT NOT NULL,
+                      player1 BLOB NOT NULL,
+                      player2 BLOB NOT NULL)''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS games_user_time ON games (username, created_at)''')
+
+    # Сохраненные входы ("Запомнить меня"): в базе хранится только хеш токена
+    cursor.execute('''CREATE TABLE IF NOT EXISTS sessions (
+                      token_hash TEXT PRIMARY KEY,
+                      username TEXT NOT NULL,
+                      expires_at REAL NOT NULL)''')
+
+def _connect(db_path, schema=None):
+    """
+    Открывает подключение с настроенными PRAGMA. Схема и режим WAL создаются
+    один раз на файл базы в рамках процесса. schema — функция, создающая таблицы
+    через курсор (по умолчанию таблицы пользователей и игр).
+    """
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT_MS / 1000)
+    for name, value in PRAGMAS:
+        conn.execute(f"PRAGMA {name} = {value}")
+
+    key = os.path.abspath(db_path)
+    if key not in _schema_ready:
+        with _schema_lock:
+            if key not in _schema_ready:
+                # Режим WAL сохраняется в файле базы, поэтому достаточно включить его один раз
+                conn.execute("PRAGMA journal_mode = WAL")
+                with conn:
+                    (schema or _create_schema)(conn.cursor())
+                _schema_ready.add(key)
+    return conn
+
+def get_connection(db_path=DB_PATH, schema=None):
+    """
+    Возвращает подключение текущего потока к базе (создается при первом обращении и переиспользуется).
+    Подключения не разделяются между потоками и процессами; после fork открывается новое.
+    schema передается в _connect при первом подключении к файлу.
+    """
+    pid = os.getpid()
+    if getattr(_local, "pid", None) != pid:
+        _local.pid = pid
+        _local.connections = {}
+
+    conn = _local.connections.get(db_path)
+    if conn is None:
+        conn = _connect(db_path, schema)
+        _local.connections[db_path] = conn
+    return conn
+
+@contextmanager
+def transaction(db_path=DB_PATH, schema=None):
+    """
+    Контекстный менеджер транзакции на подключении текущего потока.
+    Блокировка на запись берется сразу (BEGIN IMMEDIATE), чтобы параллельные писатели
+    ждали по busy_timeout, а не получали ошибку при повышении блокировки.
+    При выходе транзакция фиксируется, при исключении — откатывается.
+    """
+    conn = get_connection(db_path, schema)
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        yield cursor
+    except BaseException:
+        conn.rollback()
+        raise
+    else:
+        conn.commit()
+    finally:
+        cursor.close()
+
+def close_connections():
+    """
+    Закрывает подключения текущего потока.
+    """
+    for conn in getattr(_local, "connections", {}).values():
+        conn.close()
+    _local.connections = {}
+
+def get_db_connection(db_path=DB_PATH):
+    """
+    Открывает отдельное подключение (вызывающий код сам закрывает его).
+    Оставлено для совместимости; новый код использует get_connection() и transaction().
+    """
+    conn = _connect(db_path)
+    return conn, conn.cursor()
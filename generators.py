@@ -0,0 +1,107 @@
+"""
+Генерация случайных биматричных игр целиком, без циклов по ячейкам.
+
+Все функции принимают форму shape: (rows, cols) для одной игры или (count, rows, cols)
+для стопки игр, и seed — число, np.random.SeedSequence или np.random.Generator.
+Один и тот же seed дает одни и те же игры.
+"""
+import numpy as np
+
+def _uniform(rng, shape, low, high, integer):
+    if integer:
+        return rng.integers(low, high, size=shape, endpoint=True)
+    return rng.uniform(low, high, size=shape)
+
+def uniform_game(rng, shape, low=1, high=10, integer=True):
+    """Независимые равномерно распределенные выигрыши из [low, high]"""
+    return _uniform(rng, shape, low, high, integer), _uniform(rng, shape, low, high, integer)
+
+def zero_sum_game(rng, shape, low=-10, high=10, integer=True):
+    """Антагонистическая игра: выигрыш второго игрока равен проигрышу первого"""
+    player1_matrix = _uniform(rng, shape, low, high, integer)
+    return player1_matrix, -player1_matrix
+
+def coordination_game(rng, shape, low=1, high=10, integer=True):
+    """
+    Игра с общими интересами: у игроков одинаковые выигрыши, а совпадающие стратегии (i, i)
+    получают надбавку high - low, поэтому каждая из них — равновесие Нэша.
+    """
+    payoffs = _uniform(rng, shape, low, high, integer)
+    diagonal = np.arange(min(shape[-2:]))
+    payoffs[..., diagonal, diagonal] += high - low
+    return payoffs, payoffs.copy()
+
+def potential_game(rng, shape, low=1, high=10, integer=True):
+    """
+    Точная потенциальная игра: u1(i, j) = Φ(i, j) + h1(j), u2(i, j) = Φ(i, j) + h2(i).
+    Изменение выигрыша любого игрока при смене его стратегии равно изменению потенциала Φ,
+    поэтому в игре всегда есть равновесие в чистых стратегиях.
+    """
+    potential = _uniform(rng, shape, low, high, integer)
+    column_terms = _uniform(rng, shape[:-2] + (1, shape[-1]), low, high, integer)
+    row_terms = _uniform(rng, shape[:-1] + (1,), low, high, integer)
+    return potential + column_terms, potential + row_terms
+
+def covariance_game(rng, shape, correlation=0.0, mean=0.0, std=1.0, integer=False):
+    """
+    Выигрыши ячейки (a, b) — нормальные величины со средним mean, отклонением std и корреляцией correlation:
+    при -1 игра антагонистическая (с точностью до сдвига), при 1 — с общими интересами.
+    При integer=True выигрыши округляются до целых.
+    """
+    if not -1.0 <= correlation <= 1.0:
+        raise ValueError("Корреляция выигрышей должна быть в диапазоне [-1, 1].")
+    first = rng.standard_normal(shape)
+    second = correlation * first + np.sqrt(1.0 - correlation ** 2) * rng.standard_normal(shape)
+    player1_matrix, player2_matrix = mean + std * first, mean + std * second
+    if integer:
+        return np.rint(player1_matrix), np.rint(player2_matrix)
+    return player1_matrix, player2_matrix
+
+def sparse_game(rng, shape, density=0.1, low=1, high=10, integer=True):
+    """Равномерные выигрыши, из которых ненулевыми остается доля density (ячейки обнуляются у обоих игроков)"""
+    if not 0.0 <= density <= 1.0:
+        raise ValueError("Доля ненулевых выигрышей должна быть в диапазоне [0, 1].")
+    player1_matrix, player2_matrix = uniform_game(rng, shape, low, high, integer)
+    zero = rng.random(shape) >= density
+    player1_matrix[zero] = 0
+    player2_matrix[zero] = 0
+    return player1_matrix, player2_matrix
+
+GAME_FAMILIES = {
+    "uniform": uniform_game,
+    "zero-sum": zero_sum_game,
+    "coordination": coordination_game,
+    "potential": potential_game,
+    "covariance": covariance_game,
+    "sparse": sparse_game,
+}
+
+def generate_game(rows, cols, family="uniform", seed=None, count=None, **params):
+    """
+    Создает одну игру (rows × cols) или, если задан count, стопку из count игр формы (count, rows, cols).
+    family — ключ GAME_FAMILIES, params передаются функции семейства (low, high, integer, correlation, density...).
+    Возвращает два массива выигрышей.
+    """
+    try:
+        generate = GAME_FAMILIES[family]
+    except KeyError:
+        raise ValueError(f"Неизвестное семейство игр: {family}") from None
+    shape = (rows, cols) if count is None else (count, rows, cols)
+    return generate(np.random.default_rng(seed), shape, **params)
+
+def iter_games(count, rows, cols, family="uniform", seed=None, batch_size=10000, **params):
+    """
+    Лениво выдает count игр стопками по batch_size (массивы формы (k, rows, cols)).
+    Каждая стопка получает свой дочерний seed, поэтому результат зависит только от seed и batch_size,
+    а стопки можно генерировать и в разных процессах. Если seed — np.random.Generator,
+    дочерние генераторы порождаются из него (Generator.spawn).
+    """
+    batches = -(-count // batch_size)
+    if isinstance(seed, np.random.Generator):
+        children = seed.spawn(batches)
+    else:
+        seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        children = seed_sequence.spawn(batches)
+    for index, child in enumerate(children):
+        size = min(batch_size, count - index * batch_size)
+        yield generate_game(rows, cols, family, child, count=size, **params)
@@ -0,0 +1,138 @@
+import numpy as np
+
+# Попарные счетчики для доминирования хранятся, только если у обоих игроков не больше стратегий:
+# они занимают O(rows² + cols²) памяти и строятся за O(rows·cols·max(rows, cols))
+DOMINANCE_COUNTS_MAX_STRATEGIES = 200
+
+class _DominanceCounts:
+    """
+    Счетчики попарных сравнений строк матрицы выигрышей (для второго игрока передается транспонированная матрица).
+    less_equal[i, k] — число столбцов, где payoffs[i] <= payoffs[k], less[i, k] — где payoffs[i] < payoffs[k].
+    Строка i слабо доминируется строкой k, если less_equal[i, k] равно числу столбцов и less[i, k] > 0,
+    и строго — если less[i, k] равно числу столбцов. Для каждой строки хранится число доминирующих ее строк.
+    """
+    def __init__(self, payoffs):
+        self.payoffs = payoffs
+        rows, cols = payoffs.shape
+        self.less_equal = np.empty((rows, rows), dtype=np.int32)
+        self.less = np.empty((rows, rows), dtype=np.int32)
+        # Строки сравниваются блоками, чтобы не строить массив rows × rows × cols целиком
+        block = max(1, (1 << 22) // max(1, rows * cols))
+        for start in range(0, rows, block):
+            chunk = payoffs[start:start + block, None, :]
+            self.less_equal[start:start + block] = np.count_nonzero(chunk <= payoffs[None, :, :], axis=2)
+            self.less[start:start + block] = np.count_nonzero(chunk < payoffs[None, :, :], axis=2)
+
+        self.weak_dominators = self._weak(self.less_equal, self.less).sum(axis=1)
+        self.strict_dominators = self._strict(self.less).sum(axis=1)
+
+    def _weak(self, less_equal, less):
+        return (less_equal == self.payoffs.shape[1]) & (less > 0)
+
+    def _strict(self, less):
+        return less == self.payoffs.shape[1]
+
+    def update(self, i, j, old):
+        """
+        Пересчитывает сравнения строки i со всеми остальными после изменения payoffs[i, j] (прежнее значение old).
+        """
+        new = self.payoffs[i, j]
+        column = self.payoffs[:, j]
+        old_column = column.copy()
+        old_column[i] = old
+
+        weak_row, weak_col = self._weak(self.less_equal[i], self.less[i]), self._weak(self.less_equal[:, i], self.less[:, i])
+        strict_row, strict_col = self._strict(self.less[i]), self._strict(self.less[:, i])
+
+        # Диагональ не меняется: в обоих слагаемых сравнивается значение само с собой
+        self.less_equal[i] += (new <= column).astype(np.int32) - (old <= old_column)
+        self.less[i] += (new < column).astype(np.int32) - (old < old_column)
+        self.less_equal[:, i] += (column <= new).astype(np.int32) - (old_column <= old)
+        self.less[:, i] += (column < new).astype(np.int32) - (old_column < old)
+
+        new_weak_row, new_weak_col = self._weak(self.less_equal[i], self.less[i]), self._weak(self.less_equal[:, i], self.less[:, i])
+        new_strict_row, new_strict_col = self._strict(self.less[i]), self._strict(self.less[:, i])
+
+        self.weak_dominators[i] += int(new_weak_row.sum()) - int(weak_row.sum())
+        self.weak_dominators += new_weak_col.astype(np.int64) - weak_col
+        self.strict_dominators[i] += int(new_strict_row.sum()) - int(strict_row.sum())
+        self.strict_dominators += new_strict_col.astype(np.int64) - strict_col
+
+    def dominated(self, weak=True):
+        return (self.weak_dominators if weak else self.strict_dominators) > 0
+
+class IncrementalGame:
+    """
+    Состояние анализа игры, которое поддерживается при правке отдельных ячеек.
+    Хранит минимумы строк первого игрока и столбцов второго (для минимакса), максимумы столбцов первого
+    и строк второго вместе с масками лучших ответов, множество равновесий в чистых стратегиях и,
+    для небольших игр, счетчики доминирования. Изменение одной ячейки пересчитывается за O(rows + cols).
+    Массивы выигрышей не копируются: update_cell вызывается после записи нового значения в них.
+    """
+    def __init__(self, player1_matrix, player2_matrix):
+        self.reset(player1_matrix, player2_matrix)
+
+    def reset(self, player1_matrix, player2_matrix):
+        """Полностью пересчитывает состояние для новой игры"""
+        self.player1_matrix = player1_matrix
+        self.player2_matrix = player2_matrix
+
+        self.p1_row_min = player1_matrix.min(axis=1)
+        self.p1_col_max = player1_matrix.max(axis=0)
+        self.p2_col_min = player2_matrix.min(axis=0)
+        self.p2_row_max = player2_matrix.max(axis=1)
+
+        self.best_response_p1 = player1_matrix == self.p1_col_max
+        self.best_response_p2 = player2_matrix == self.p2_row_max[:, None]
+        self.equilibrium_mask = self.best_response_p1 & self.best_response_p2
+        self.equilibria = set(map(tuple, np.argwhere(self.equilibrium_mask).tolist()))
+
+        self.row_dominance = self.col_dominance = None
+        if max(player1_matrix.shape) <= DOMINANCE_COUNTS_MAX_STRATEGIES:
+            self.row_dominance = _DominanceCounts(player1_matrix)
+            self.col_dominance = _DominanceCounts(player2_matrix.T)
+
+    def update_cell(self, i, j, old_payoff1, old_payoff2):
+        """Обновляет состояние после изменения ячейки (i, j); old_payoff1 и old_payoff2 — прежние выигрыши"""
+        player1_matrix, player2_matrix = self.player1_matrix, self.player2_matrix
+
+        self.p1_row_min[i] = player1_matrix[i].min()
+        self.p1_col_max[j] = player1_matrix[:, j].max()
+        self.p2_col_min[j] = player2_matrix[:, j].min()
+        self.p2_row_max[i] = player2_matrix[i].max()
+
+        # Лучший ответ первого игрока меняется только в столбце j, второго — только в строке i
+        self.best_response_p1[:, j] = player1_matrix[:, j] == self.p1_col_max[j]
+        self.best_response_p2[i] = player2_matrix[i] == self.p2_row_max[i]
+        self._update_equilibria(np.s_[i, :], lambda k: (i, k))
+        self._update_equilibria(np.s_[:, j], lambda k: (k, j))
+
+        if self.row_dominance is not None:
+            self.row_dominance.update(i, j, old_payoff1)
+            self.col_dominance.update(j, i, old_payoff2)
+
+    def _update_equilibria(self, line, cell):
+        new = self.best_response_p1[line] & self.best_response_p2[line]
+        for k in np.flatnonzero(new != self.equilibrium_mask[line]):
+            if new[k]:
+                self.equilibria.add(cell(int(k)))
+            else:
+                self.equilibria.discard(cell(int(k)))
+        self.equilibrium_mask[line] = new
+
+    def maximin_values(self):
+        """Максиминные выигрыши игроков в чистых стратегиях, как Functions.maximin_values"""
+        return self.p1_row_min.max(), self.p2_col_min.max()
+
+    def pure_nash_equilibria(self):
+        """Равновесия в чистых стратегиях в том же виде, что Functions.pure_nash_equilibria"""
+        return np.array(sorted(self.equilibria), dtype=np.intp).reshape(-1, 2)
+
+    def has_dominated(self, weak=True):
+        """
+        Есть ли в игре доминируемые строки или столбцы (без итеративного исключения).
+        Возвращает None, если счетчики доминирования для игры такого размера не ведутся.
+        """
+        if self.row_dominance is None:
+            return None
+        return bool(self.row_dominance.dominated(weak).any() or self.col_dominance.dominated(weak).any())
@@ -1,13 +1,15 @@
-from PyQt6.QtWidgets import QWidget, QLabel, QLineEdit, QPushButton, QMessageBox, QVBoxLayout
+from PyQt6.QtWidgets import QWidget, QLabel, QLineEdit, QPushButton, QMessageBox, QVBoxLayout, QCheckBox
 from PyQt6.QtGui import QIcon
-from auth import register_user, validate_user
-from main_window import MainWindow
+from auth import register_user, validate_user, create_session, save_session_token
+
+# main_window (а вместе с ним NumPy и решатели) импортируется только после входа,
+# чтобы окно авторизации появлялось сразу
 
 class LoginWindow(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Авторизация")
-        self.setFixedSize(300, 200)
+        self.setFixedSize(300, 230)
         self.setWindowIcon(QIcon('gm.png'))
 
         layout = QVBoxLayout()
@@ -22,6 +24,9 @@ class LoginWindow(QWidget):
         self.password_entry.setEchoMode(QLineEdit.EchoMode.Password)
         layout.addWidget(self.label_pass)
         layout.addWidget(self.password_entry)
+
+        self.remember_checkbox = QCheckBox("Запомнить меня")
+        layout.addWidget(self.remember_checkbox)
         
         self.login_button = QPushButton("Войти")
         self.login_button.clicked.connect(self.login)
@@ -35,12 +40,18 @@ class LoginWindow(QWidget):
 
     def login(self):
         if validate_user(self.username_entry.text(), self.password_entry.text()):
-            self.close()
-            self.main_window = MainWindow(self.username_entry.text())
-            self.main_window.show()
+            if self.remember_checkbox.isChecked():
+                save_session_token(create_session(self.username_entry.text()))
+            self.open_main_window(self.username_entry.text())
         else:
             QMessageBox.warning(self, "Ошибка", "Неверный логин или пароль!")
     
+    def open_main_window(self, username):
+        from main_window import MainWindow
+        self.close()
+        self.main_window = MainWindow(username)
+        self.main_window.show()
+
     def register(self):
         if register_user(self.username_entry.text(), self.password_entry.text()):
             QMessageBox.information(self, "Успех", "Регистрация успешна!")
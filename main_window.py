@@ -1,12 +1,83 @@
-from PyQt6.QtWidgets import QWidget, QLabel, QTableWidget, \
-    QPushButton, QVBoxLayout, QHBoxLayout, QScrollArea, QTableWidgetItem, QMessageBox
+from PyQt6.QtWidgets import QWidget, QLabel, QTableView, QPushButton, QVBoxLayout, QHBoxLayout, \
+    QMessageBox, QProgressBar, QAbstractItemView, QHeaderView, QSpinBox, QComboBox
 from PyQt6.QtGui import QIcon
-from PyQt6.QtCore import Qt
-import csv
-import random
-from io import StringIO
-import database as db
-from Functions import remove_dominated_strategies, save_csv_to_db, minimax_bimatrix, nash_equilibria
+from PyQt6.QtCore import QThreadPool
+import numpy as np
+from Functions import dominance_survivors, mixed_nash_equilibria, security_strategies, format_payoff
+from storage import save_game, load_latest_game, import_csv_blob, export_csv_blob
+from matrix_model import BimatrixModel
+from workers import AnalysisWorker
+from incremental import IncrementalGame
+from generators import generate_game
+from auth import forget_session
+from result_cache import default_cache, operation_name
+
+# Ограничение времени (в секундах) на поиск смешанного равновесия
+MIXED_NASH_TIME_LIMIT = 30.0
+# Настройки решателей; входят в ключ кэша результатов
+MIXED_NASH_METHOD = "lemke-howson"
+MIXED_NASH_INITIAL_LABEL = 0
+SECURITY_MODE = "auto"
+SECURITY_TOL = 1e-7
+# Наибольший размер игры, который можно задать вручную: изменение размера выделяет массивы
+# выигрышей и масок в потоке интерфейса, а на 2000×2000 это уже около 130 МБ
+MAX_MATRIX_SIZE = 2000
+# Сколько равновесий показывать в окне сообщения
+MAX_SHOWN_EQUILIBRIA = 50
+# Наибольшее число ячеек, для которого вместе с минимаксом решается ЛП смешанных гарантирующих стратегий
+MAX_SECURITY_LP_ELEMENTS = 1 << 18
+# Семейства случайных игр для кнопки генерации: подпись, ключ generators.GAME_FAMILIES и параметры
+GENERATED_FAMILIES = [
+    ("Равномерные выигрыши", "uniform", {}),
+    ("Антагонистическая", "zero-sum", {}),
+    ("Координационная", "coordination", {}),
+    ("Потенциальная", "potential", {}),
+    ("Коррелированные выигрыши", "covariance", {"correlation": 0.5, "mean": 5, "std": 3, "integer": True}),
+    ("Разреженная", "sparse", {"density": 0.2}),
+]
+
+# Задачи для рабочих потоков: получают массивы выигрышей и обратный вызов прогресса.
+# Минимакс и равновесия в чистых стратегиях берутся из IncrementalGame, в потоках считаются
+# только смешанные стратегии и итеративное исключение доминируемых стратегий.
+# Их результаты сохраняются в result_cache, поэтому повторный анализ той же игры
+# (в том числе уже посчитанной batch.py) не пересчитывается
+
+def security_task(player1_matrix, player2_matrix, progress):
+    """Смешанные гарантирующие стратегии; None, если нет scipy или решатель не сошелся"""
+    def compute():
+        try:
+            (x, value_p1), (y, value_p2) = security_strategies(player1_matrix, player2_matrix,
+                                                               mode=SECURITY_MODE, tol=SECURITY_TOL)
+        except RuntimeError:
+            return None
+        return x, value_p1, y, value_p2
+
+    security = default_cache().cached(operation_name("security", SECURITY_MODE, SECURITY_TOL),
+                                      player1_matrix, player2_matrix, compute)
+    progress(1.0)
+    if security is None:
+        return None
+    x, value_p1, y, value_p2 = security
+    return (x, value_p1), (y, value_p2)
+
+def mixed_nash_task(player1_matrix, player2_matrix, progress):
+    """Ищет одно смешанное равновесие; None, если не уложились в лимит времени"""
+    def compute():
+        try:
+            return mixed_nash_equilibria(player1_matrix, player2_matrix, method=MIXED_NASH_METHOD,
+                                         initial_label=MIXED_NASH_INITIAL_LABEL,
+                                         time_limit=MIXED_NASH_TIME_LIMIT, progress=progress)[0]
+        except TimeoutError:
+            return None
+
+    return default_cache().cached(operation_name("mixed-nash", MIXED_NASH_METHOD, MIXED_NASH_INITIAL_LABEL),
+                                  player1_matrix, player2_matrix, compute)
+
+def dominance_task(player1_matrix, player2_matrix, weak, progress):
+    rows, cols = default_cache().cached(
+        "weak-dom" if weak else "strict-dom", player1_matrix, player2_matrix,
+        lambda: dominance_survivors(player1_matrix, player2_matrix, weak=weak, progress=progress))
+    return player1_matrix[np.ix_(rows, cols)], player2_matrix[np.ix_(rows, cols)], rows, cols
 
 # Класс главного окна приложения
 class MainWindow(QWidget):
@@ -34,20 +105,37 @@ class MainWindow(QWidget):
             self.size_buttons.append(button)
             size_layout.addWidget(button)
 
-        layout.addLayout(size_layout)
-
-        # Контейнер для таблицы с выравниванием по центру
-        table_layout = QVBoxLayout()  # Используем VBoxLayout для выравнивания по вертикали
-        table_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)  # Выравниваем по центру
+        # Произвольный размер игры
+        self.rows_input = QSpinBox()
+        self.rows_input.setRange(1, MAX_MATRIX_SIZE)
+        self.rows_input.setValue(3)
+        self.cols_input = QSpinBox()
+        self.cols_input.setRange(1, MAX_MATRIX_SIZE)
+        self.cols_input.setValue(3)
+        self.apply_size_button = QPushButton("Применить")
+        self.apply_size_button.clicked.connect(self.apply_custom_size)
+        size_layout.addWidget(QLabel("Строк:"))
+        size_layout.addWidget(self.rows_input)
+        size_layout.addWidget(QLabel("Столбцов:"))
+        size_layout.addWidget(self.cols_input)
+        size_layout.addWidget(self.apply_size_button)
+        self.size_buttons.append(self.apply_size_button)
 
-        # Таблица для биматричных данных
-        self.matrix_table = QTableWidget(3, 3)
-        scroll_area = QScrollArea()
-        scroll_area.setWidget(self.matrix_table)
-        scroll_area.setWidgetResizable(True)
-        table_layout.addWidget(scroll_area)
+        layout.addLayout(size_layout)
 
-        layout.addLayout(table_layout)  # Добавляем таблицу в основной макет
+        # Таблица для биматричных данных: представление над моделью с массивами NumPy.
+        # Фиксированный размер секций избавляет от измерения содержимого всех строк и столбцов.
+        self.matrix_model = BimatrixModel(3, 3)
+        self.matrix_table = QTableView()
+        self.matrix_table.setModel(self.matrix_model)
+        # Минимакс, лучшие ответы и доминирование поддерживаются при правке ячеек
+        self.incremental = IncrementalGame(*self.matrix_model.matrices())
+        self.matrix_model.cellChanged.connect(self.incremental.update_cell)
+        self.matrix_model.modelReset.connect(lambda: self.incremental.reset(*self.matrix_model.matrices()))
+        for header in (self.matrix_table.horizontalHeader(), self.matrix_table.verticalHeader()):
+            header.setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.matrix_table.horizontalHeader().setDefaultSectionSize(80)
+        layout.addWidget(self.matrix_table)
 
         self.minimax_button = QPushButton("Рассчитать минимакс")
         self.minimax_button.clicked.connect(self.calculate_minimax)
@@ -67,166 +155,245 @@ class MainWindow(QWidget):
         self.remove_strict_button.clicked.connect(self.remove_strict_dominated_strategies)
         layout.addWidget(self.remove_strict_button)
         
+        generate_layout = QHBoxLayout()
         self.generate_button = QPushButton("Генерировать значения")
         self.generate_button.clicked.connect(self.generate_matrix_values)
-        layout.addWidget(self.generate_button)
+        self.family_input = QComboBox()
+        self.family_input.addItems([label for label, _, _ in GENERATED_FAMILIES])
+        generate_layout.addWidget(self.generate_button)
+        generate_layout.addWidget(self.family_input)
+        layout.addLayout(generate_layout)
 
-        self.save_button = QPushButton("Сохранить в CSV")
+        self.save_button = QPushButton("Сохранить в базу данных")
         self.save_button.clicked.connect(self.save_to_db)
         layout.addWidget(self.save_button)
 
+        self.export_button = QPushButton("Экспортировать в CSV")
+        self.export_button.clicked.connect(self.export_to_csv)
+        layout.addWidget(self.export_button)
+
         self.load_button = QPushButton("Загрузить последнюю сохраненную матрицу")
         self.load_button.clicked.connect(self.load_from_db)
         layout.addWidget(self.load_button)
 
+        self.logout_button = QPushButton("Выйти из учетной записи")
+        self.logout_button.clicked.connect(self.logout)
+        layout.addWidget(self.logout_button)
+
+        # Прогресс и отмена длительных расчетов, которые выполняются вне потока интерфейса
+        progress_layout = QHBoxLayout()
+        self.progress_label = QLabel()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.cancel_button = QPushButton("Отменить")
+        self.cancel_button.clicked.connect(self.cancel_analysis)
+        progress_layout.addWidget(self.progress_label)
+        progress_layout.addWidget(self.progress_bar)
+        progress_layout.addWidget(self.cancel_button)
+        layout.addLayout(progress_layout)
+
         self.setLayout(layout)
 
+        self.thread_pool = QThreadPool.globalInstance()
+        self.current_worker = None
+        self.default_edit_triggers = self.matrix_table.editTriggers()
+        self.analysis_buttons = [self.minimax_button, self.nash_button, self.remove_weak_button,
+                                 self.remove_strict_button, self.generate_button, self.save_button, self.export_button,
+                                 self.load_button, self.logout_button]
+        self.set_analysis_running(False)
+
     def create_size_button_handler(self, size_str):
         def handler():
-            size = int(size_str[0])  # Получаем размер из строки, например "3x3" -> 3
-            self.matrix_table.setRowCount(size)
-            self.matrix_table.setColumnCount(size)
+            rows, cols = map(int, size_str.split("x"))  # Получаем размер из строки, например "3x3" -> (3, 3)
+            self.set_matrix_size(rows, cols)
         return handler
 
-    def generate_matrix_values(self):
-        """Генерирует случайные значения для матрицы в формате (выигрыш_игрока_1;выигрыш_игрока_2)"""
-        for i in range(self.matrix_table.rowCount()):
-            for j in range(self.matrix_table.columnCount()):
-                value_player1 = random.randint(1, 10)
-                value_player2 = random.randint(1, 10)
-                self.matrix_table.setItem(i, j, QTableWidgetItem(f"({value_player1};{value_player2})"))
-
-    def remove_weak_dominated_strategies(self):
-        # Получаем текущую матрицу из таблицы
-        matrix = [[self.matrix_table.item(i, j).text() if self.matrix_table.item(i, j) else '(0;0)'
-                for j in range(self.matrix_table.columnCount())]
-                for i in range(self.matrix_table.rowCount())]
+    def apply_custom_size(self):
+        self.set_matrix_size(self.rows_input.value(), self.cols_input.value())
 
-        # Вызываем функцию для удаления слабо доминируемых стратегий
-        reduced_matrix1, reduced_matrix2 = remove_dominated_strategies(matrix, weak=True)
+    def set_matrix_size(self, rows, cols):
+        self.matrix_model.resize(rows, cols)
+        self.rows_input.setValue(rows)
+        self.cols_input.setValue(cols)
 
-        # Определим новый размер таблицы, который соответствует уменьшенной матрице
-        new_rows, new_cols = reduced_matrix1.shape
+    def generate_matrix_values(self):
+        """Генерирует случайную игру выбранного семейства в формате (выигрыш_игрока_1;выигрыш_игрока_2)"""
+        rows, cols = self.matrix_model.rowCount(), self.matrix_model.columnCount()
+        _, family, params = GENERATED_FAMILIES[self.family_input.currentIndex()]
+        self.matrix_model.set_matrices(*generate_game(rows, cols, family, **params))
+
+    def start_analysis(self, title, func, on_finished, *args, **kwargs):
+        """Запускает вычисление в пуле потоков; результат передается в on_finished в потоке интерфейса"""
+        if self.current_worker is not None:
+            QMessageBox.warning(self, "Ошибка", "Дождитесь окончания текущего расчета или отмените его.")
+            return
 
-        # Обновим размеры таблицы
-        self.matrix_table.setRowCount(new_rows)
-        self.matrix_table.setColumnCount(new_cols)
+        worker = AnalysisWorker(func, *args, **kwargs)
+        worker.signals.progress.connect(self.progress_bar.setValue)
+        worker.signals.finished.connect(self.analysis_done)
+        worker.signals.failed.connect(self.analysis_done)
+        worker.signals.cancelled.connect(self.analysis_done)
+        worker.signals.finished.connect(on_finished)
+        worker.signals.failed.connect(lambda message: QMessageBox.warning(self, "Ошибка", message))
+
+        self.current_worker = worker
+        self.set_analysis_running(True, title)
+        self.thread_pool.start(worker)
+
+    def cancel_analysis(self):
+        if self.current_worker is not None:
+            self.current_worker.cancel()
+            self.progress_label.setText("Отмена...")
+
+    def analysis_done(self, *args):
+        self.current_worker = None
+        self.set_analysis_running(False)
+
+    def set_analysis_running(self, running, title=""):
+        """Блокирует кнопки и редактирование таблицы на время расчета и показывает прогресс"""
+        for button in self.size_buttons + self.analysis_buttons:
+            button.setEnabled(not running)
+        self.matrix_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers if running
+                                          else self.default_edit_triggers)
+        self.progress_label.setText(title)
+        self.progress_bar.setValue(0)
+        for widget in (self.progress_label, self.progress_bar, self.cancel_button):
+            widget.setVisible(running)
+
+    def logout(self):
+        """Забывает сохраненный вход и возвращает к окну авторизации"""
+        from login_window import LoginWindow
+        forget_session()
+        self.close()
+        self.login_window = LoginWindow()
+        self.login_window.show()
+
+    def closeEvent(self, event):
+        # Незавершенный расчет прерывается при закрытии окна
+        self.cancel_analysis()
+        super().closeEvent(event)
+
+    def fill_reduced_table(self, result):
+        reduced_matrix1, reduced_matrix2, rows, cols = result
+
+        # Оставшиеся стратегии сохраняют свои исходные номера
+        self.matrix_model.set_matrices(reduced_matrix1, reduced_matrix2,
+                                       self.matrix_model.row_strategies[rows], self.matrix_model.col_strategies[cols])
 
-        # Заполним таблицу обновленными значениями
-        for i in range(new_rows):
-            for j in range(new_cols):
-                self.matrix_table.setItem(i, j, QTableWidgetItem(f"({int(reduced_matrix1[i, j])};{int(reduced_matrix2[i, j])})"))
+    def remove_weak_dominated_strategies(self):
+        if self.incremental.has_dominated(weak=True) is False:
+            QMessageBox.information(self, "Удаление слабо доминируемых стратегий", "Слабо доминируемых стратегий нет.")
+            return
+        self.start_analysis("Удаление слабо доминируемых стратегий...", dominance_task,
+                            self.on_weak_dominance_finished, *self.matrix_model.matrices(), weak=True)
 
+    def on_weak_dominance_finished(self, result):
+        self.fill_reduced_table(result)
         QMessageBox.information(self, "Удаление слабо доминируемых стратегий", "Слабо доминируемые стратегии удалены.")
 
     def remove_strict_dominated_strategies(self):
-        # Получаем текущую матрицу из таблицы
-        matrix = [[self.matrix_table.item(i, j).text() if self.matrix_table.item(i, j) else '(0;0)'
-                for j in range(self.matrix_table.columnCount())]
-                for i in range(self.matrix_table.rowCount())]
-
-        # Вызываем функцию для удаления строго доминируемых стратегий
-        reduced_matrix1, reduced_matrix2 = remove_dominated_strategies(matrix, weak=False)
-
-        # Определим новый размер таблицы, который соответствует уменьшенной матрице
-        new_rows, new_cols = reduced_matrix1.shape
-
-        # Обновим размеры таблицы
-        self.matrix_table.setRowCount(new_rows)
-        self.matrix_table.setColumnCount(new_cols)
-
-        # Заполним таблицу обновленными значениями
-        for i in range(new_rows):
-            for j in range(new_cols):
-                self.matrix_table.setItem(i, j, QTableWidgetItem(f"({int(reduced_matrix1[i, j])};{int(reduced_matrix2[i, j])})"))
+        if self.incremental.has_dominated(weak=False) is False:
+            QMessageBox.information(self, "Удаление строго доминируемых стратегий", "Строго доминируемых стратегий нет.")
+            return
+        self.start_analysis("Удаление строго доминируемых стратегий...", dominance_task,
+                            self.on_strict_dominance_finished, *self.matrix_model.matrices(), weak=False)
 
+    def on_strict_dominance_finished(self, result):
+        self.fill_reduced_table(result)
         QMessageBox.information(self, "Удаление строго доминируемых стратегий", "Строго доминируемые стратегии удалены.")
-    
+
     def calculate_minimax(self):
-        matrix = [[self.matrix_table.item(i, j).text() if self.matrix_table.item(i, j) else '(0;0)'
-                   for j in range(self.matrix_table.columnCount())]
-                  for i in range(self.matrix_table.rowCount())]
+        maximin = self.incremental.maximin_values()
+        if self.matrix_model.player1_matrix.size > MAX_SECURITY_LP_ELEMENTS:
+            self.on_minimax_finished(maximin, None)
+            return
+        self.pending_maximin = maximin
+        self.start_analysis("Расчет гарантирующих стратегий...", security_task, self.on_security_finished,
+                            *self.matrix_model.matrices())
+
+    def on_security_finished(self, security):
+        self.on_minimax_finished(self.pending_maximin, security)
+
+    def on_minimax_finished(self, maximin, security):
+        maximin_p1, maximin_p2 = maximin
+        text = f"Минимакс первого игрока: {format_payoff(maximin_p1)}\nМинимакс второго игрока: {format_payoff(maximin_p2)}"
+        if security is not None:
+            (x, value_p1), (y, value_p2) = security
+            text += "\n\nВ смешанных стратегиях:\n" \
+                    f"Первый игрок гарантирует {value_p1:.3f}: {self.format_mixed_strategy(x, 'A', self.matrix_model.row_strategies)}\n" \
+                    f"Второй игрок гарантирует {value_p2:.3f}: {self.format_mixed_strategy(y, 'B', self.matrix_model.col_strategies)}"
+        QMessageBox.information(self, "Минимакс", text)
+
+    def format_mixed_strategy(self, probabilities, prefix, strategies):
+        # Показываем только стратегии с ненулевой вероятностью
+        support = np.flatnonzero(probabilities > 1e-9)
+        parts = [f"{prefix}{strategies[i] + 1}={probabilities[i]:.3f}" for i in support[:MAX_SHOWN_EQUILIBRIA]]
+        if len(support) > MAX_SHOWN_EQUILIBRIA:
+            parts.append(f"... и еще {len(support) - MAX_SHOWN_EQUILIBRIA}")
+        return ", ".join(parts)
 
-        maximin_p1, maximin_p2 = minimax_bimatrix(matrix)
-        QMessageBox.information(self, "Минимакс", f"Минимакс первого игрока: {maximin_p1}\nМинимакс второго игрока: {maximin_p2}")
-    
     def calculate_nash(self):
-        matrix = [[self.matrix_table.item(i, j).text() if self.matrix_table.item(i, j) else '(0;0)'
-                   for j in range(self.matrix_table.columnCount())]
-                  for i in range(self.matrix_table.rowCount())]
-        
-        equilibria = nash_equilibria(matrix)
-        if equilibria:
-            eq_str = "\n".join([f"Стратегия A={eq[0] + 1}, B={eq[1] + 1}" for eq in equilibria])
+        equilibria = self.incremental.pure_nash_equilibria()
+        if len(equilibria):
+            self.on_nash_finished(equilibria, None)
+            return
+        self.start_analysis("Поиск смешанного равновесия Нэша...", mixed_nash_task, self.on_mixed_nash_finished,
+                            *self.matrix_model.matrices())
+
+    def on_mixed_nash_finished(self, mixed):
+        self.on_nash_finished(self.incremental.pure_nash_equilibria(), mixed)
+
+    def on_nash_finished(self, equilibria, mixed):
+        row_strategies, col_strategies = self.matrix_model.row_strategies, self.matrix_model.col_strategies
+        if len(equilibria):
+            eq_str = "\n".join([f"Стратегия A={row_strategies[i] + 1}, B={col_strategies[j] + 1}"
+                                for i, j in equilibria[:MAX_SHOWN_EQUILIBRIA]])
+            if len(equilibria) > MAX_SHOWN_EQUILIBRIA:
+                eq_str += f"\n... и еще {len(equilibria) - MAX_SHOWN_EQUILIBRIA}"
+        elif mixed is None:
+            eq_str = "Равновесий Нэша в чистых стратегиях не найдено.\n" \
+                     "Поиск равновесия в смешанных стратегиях прерван по лимиту времени."
         else:
-            eq_str = "Равновесий Нэша не найдено."
-        
-        QMessageBox.information(self, "Равновесие Нэша", eq_str)
-    
-    def save_to_db(self):
-        """Сохраняет биматричную матрицу в базу данных в формате CSV"""
-        # Получаем данные из таблицы
-        matrix = [[self.matrix_table.item(i, j).text() if self.matrix_table.item(i, j) else '0'
-                   for j in range(self.matrix_table.columnCount())]
-                  for i in range(self.matrix_table.rowCount())]
-
-        # Преобразуем матрицу в CSV-строку
-        csv_buffer = StringIO()
-        writer = csv.writer(csv_buffer)
-
-        for row in matrix:
-            writer.writerow(row)
+            x, y = mixed
+            eq_str = "Равновесий Нэша в чистых стратегиях не найдено.\n" \
+                     "Равновесие в смешанных стратегиях:\n" \
+                     f"{self.format_mixed_strategy(x, 'A', row_strategies)}\n" \
+                     f"{self.format_mixed_strategy(y, 'B', col_strategies)}"
 
-        csv_data = csv_buffer.getvalue().encode()  # Преобразуем в бинарный формат
-
-        # Сохраняем CSV в базу данных
-        save_csv_to_db(self.username, csv_data)
+        QMessageBox.information(self, "Равновесие Нэша", eq_str)
 
+    def save_to_db(self):
+        """Сохраняет игру в таблицу games в двоичном виде"""
+        save_game(self.username, *self.matrix_model.matrices())
         QMessageBox.information(self, "Сохранение", "Биматричные данные сохранены в базе данных.")
 
-    def load_from_db(self):
-        """Загружает биматричную матрицу из базы данных"""
-        conn, cursor = db.get_db_connection()
+    def export_to_csv(self):
+        """Записывает игру в прежнем формате CSV (users.csv_file)"""
+        export_csv_blob(self.username, *self.matrix_model.matrices())
+        QMessageBox.information(self, "Экспорт", "Биматричные данные экспортированы в CSV.")
 
-        # Проверяем, есть ли данные в базе
-        cursor.execute("SELECT csv_file FROM users WHERE username = ?", (self.username,))
-        result = cursor.fetchone()
+    def load_from_db(self):
+        """Загружает последнюю сохраненную игру; CSV-данные прежнего формата переносятся в таблицу games"""
+        try:
+            game = load_latest_game(self.username)
+            if game is None and import_csv_blob(self.username) is not None:
+                game = load_latest_game(self.username)
+        except Exception as e:
+            QMessageBox.warning(self, "Ошибка", f"Не удалось загрузить игру: {str(e)}")
+            return
 
-        if not result or not result[0]:
+        if game is None:
             QMessageBox.warning(self, "Ошибка", "Нет сохраненных данных в базе данных.")
-            conn.close()
             return
 
-        csv_data = result[0]  # Получаем бинарные данные CSV
-
-        # Записываем временный CSV-файл
-        temp_csv_path = f"{self.username}_temp.csv"
-        with open(temp_csv_path, "wb") as f:
-            f.write(csv_data)
-
-        # Открываем CSV и загружаем в таблицу
-        try:
-            with open(temp_csv_path, "r", newline="") as file:
-                reader = csv.reader(file)
-                data = list(reader)
-
-                if not data:
-                    QMessageBox.warning(self, "Ошибка", "Файл CSV пуст.")
-                    return
-
-                # Настроим размер таблицы
-                self.matrix_table.setRowCount(len(data))
-                self.matrix_table.setColumnCount(len(data[0]))
-
-                # Заполняем таблицу данными
-                for i, row in enumerate(data):
-                    for j, value in enumerate(row):
-                        self.matrix_table.setItem(i, j, QTableWidgetItem(value))
-
-            QMessageBox.information(self, "Загрузка", "Биматричные данные загружены из базы данных.")
-
-        except Exception as e:
-            QMessageBox.warning(self, "Ошибка", f"Не удалось загрузить CSV: {str(e)}")
+        player1_matrix, player2_matrix = game
+        if max(player1_matrix.shape) > MAX_MATRIX_SIZE:
+            rows, cols = player1_matrix.shape
+            QMessageBox.warning(self, "Ошибка", f"Сохраненная игра {rows}×{cols} больше наибольшего размера "
+                                              f"{MAX_MATRIX_SIZE}×{MAX_MATRIX_SIZE}; ее можно обработать пакетным анализом.")
+            return
+        self.matrix_model.set_matrices(player1_matrix, player2_matrix)
+        self.rows_input.setValue(player1_matrix.shape[0])
+        self.cols_input.setValue(player1_matrix.shape[1])
 
-        finally:
-            conn.close()
\ No newline at end of file
+        QMessageBox.information(self, "Загрузка", "Биматричные данные загружены из базы данных.")
@@ -0,0 +1,92 @@
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+import numpy as np
+from Functions import format_payoff, parse_payoff_cell
+
+# Модель биматричной игры для QTableView.
+# Данные хранятся только в двух массивах NumPy; текст "(a;b)" формируется
+# лениво в data() и лишь для ячеек, которые представление действительно отрисовывает.
+class BimatrixModel(QAbstractTableModel):
+    # Правка одной ячейки: строка, столбец и прежние выигрыши игроков (для инкрементного пересчета анализа)
+    cellChanged = pyqtSignal(int, int, float, float)
+
+    def __init__(self, rows=3, cols=3, parent=None):
+        super().__init__(parent)
+        self.player1_matrix = np.zeros((rows, cols))
+        self.player2_matrix = np.zeros((rows, cols))
+        self.row_strategies = np.arange(rows)
+        self.col_strategies = np.arange(cols)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.player1_matrix.shape[0]
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.player1_matrix.shape[1]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            # В редактор попадает точное значение, иначе правка без изменений округлила бы выигрыш
+            exact = role == Qt.ItemDataRole.EditRole
+            i, j = index.row(), index.column()
+            return (f"({format_payoff(self.player1_matrix[i, j], exact)};"
+                    f"{format_payoff(self.player2_matrix[i, j], exact)})")
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        try:
+            payoff1, payoff2 = parse_payoff_cell(str(value))
+        except ValueError:
+            return False
+
+        i, j = index.row(), index.column()
+        old_payoff1, old_payoff2 = float(self.player1_matrix[i, j]), float(self.player2_matrix[i, j])
+        self.player1_matrix[i, j] = payoff1
+        self.player2_matrix[i, j] = payoff2
+        self.dataChanged.emit(index, index, [role])
+        self.cellChanged.emit(i, j, old_payoff1, old_payoff2)
+        return True
+
+    def flags(self, index):
+        return super().flags(index) | Qt.ItemFlag.ItemIsEditable
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        # Стратегии подписываются исходными номерами, которые сохраняются после исключения доминируемых
+        if orientation == Qt.Orientation.Vertical:
+            return f"A{self.row_strategies[section] + 1}"
+        return f"B{self.col_strategies[section] + 1}"
+
+    def set_matrices(self, player1_matrix, player2_matrix, row_strategies=None, col_strategies=None):
+        """Заменяет игру целиком; номера стратегий по умолчанию 1..n"""
+        self.beginResetModel()
+        self.player1_matrix = np.array(player1_matrix, dtype=float)
+        self.player2_matrix = np.array(player2_matrix, dtype=float)
+        rows, cols = self.player1_matrix.shape
+        self.row_strategies = np.arange(rows) if row_strategies is None else np.asarray(row_strategies)
+        self.col_strategies = np.arange(cols) if col_strategies is None else np.asarray(col_strategies)
+        self.endResetModel()
+
+    def resize(self, rows, cols):
+        """Меняет размер игры, сохраняя значения в пересечении старой и новой матриц; новые ячейки равны (0;0)"""
+        old_rows, old_cols = self.player1_matrix.shape
+        keep_rows, keep_cols = min(rows, old_rows), min(cols, old_cols)
+
+        player1_matrix = np.zeros((rows, cols))
+        player2_matrix = np.zeros((rows, cols))
+        player1_matrix[:keep_rows, :keep_cols] = self.player1_matrix[:keep_rows, :keep_cols]
+        player2_matrix[:keep_rows, :keep_cols] = self.player2_matrix[:keep_rows, :keep_cols]
+        self.set_matrices(player1_matrix, player2_matrix)
+
+    def matrices(self):
+        return self.player1_matrix, self.player2_matrix
+
+    def table_matrix(self):
+        """Возвращает игру как матрицу строк "(a;b)" (для сохранения в CSV)"""
+        return [[f"({format_payoff(a, exact=True)};{format_payoff(b, exact=True)})" for a, b in zip(row1, row2)]
+                for row1, row2 in zip(self.player1_matrix, self.player2_matrix)]
@@ -0,0 +1,391 @@
+"""
+Повторяемые биматричные игры: многократное разыгрывание одной игры популяцией независимых пар агентов.
+
+Поддерживаются стратегии и динамики обучения:
+- "tit-for-tat" — «око за око» (только для квадратных игр: ход противника повторяется как свой);
+- "fictitious-play" — фиктивная игра: лучший ответ на эмпирические частоты ходов противника;
+- "replicator" — дискретная динамика репликатора для долей стратегий в популяции;
+- "regret-matching" — выбор стратегии с вероятностями, пропорциональными положительным сожалениям.
+
+Состояние всех агентов обновляется векторно. Для «око за око» итог считается в замкнутом виде,
+а фиктивная игра переходит сразу через серии раундов, в которых лучшие ответы не меняются,
+поэтому 10^6 раундов для тысяч агентов занимают секунды. Сопоставление сожалений так же перескакивает
+серии раундов, в которых у обоих игроков положительно ровно одно сожаление и ходы детерминированы
+(в играх, где агенты приходят к равновесию в чистых стратегиях, это почти все раунды), а раунды
+со случайным выбором моделирует по одному. Динамика репликатора моделируется по раундам и
+останавливается досрочно, когда доли перестают меняться. Оценки времени — в описании simulate.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Functions import pure_nash_equilibria
+
+# Сколько случайных чисел сопоставления сожалений генерируется одним блоком (около 2 МБ):
+# блок раундов помещается в кэш процессора, а учет совместных ходов выполняется раз в блок
+RANDOM_BLOCK_ELEMENTS = 1 << 18
+# Не реже, чем раз в столько раундов, сопоставление сожалений ищет агентов с детерминированными ходами
+REGRET_CHECK_ROUNDS = 64
+# Агенты с детерминированными ходами исключаются из пораундового моделирования, только если их не меньше
+# такой доли: иначе выборка остальных агентов обходится дороже, чем экономия на раундах
+FROZEN_SHARE = 0.25
+# Доли стратегий ниже порога в динамике репликатора считаются вымершими и обнуляются:
+# иначе они уходят в денормализованные числа, и арифметика замедляется в десятки раз
+EXTINCT_SHARE = 1e-100
+# Как часто (в раундах) обнуляются вымершие доли и перенормируются распределения
+RENORMALIZE_ROUNDS = 64
+# Меньше агентов на процесс не выделяется: для небольших массивов время раунда определяется
+# накладными расходами вызовов NumPy, и деление между процессами не ускоряет расчет
+MIN_AGENTS_PER_WORKER = 256
+
+def tit_for_tat(player1_matrix, player2_matrix, rounds, agents, rng, opening=None):
+    """
+    Оба игрока первым ходом выбирают opening (по умолчанию — случайную стратегию у каждого агента),
+    затем повторяют предыдущий ход противника. Пары ходов чередуются с периодом 2,
+    поэтому частоты и выигрыши вычисляются без моделирования раундов.
+    """
+    rows, cols = player1_matrix.shape
+    if rows != cols:
+        raise ValueError("Стратегия «око за око» определена только для игр с одинаковым числом стратегий у игроков.")
+    if opening is None:
+        first1, first2 = rng.integers(rows, size=agents), rng.integers(cols, size=agents)
+    else:
+        first1 = np.full(agents, opening)
+        first2 = np.full(agents, opening)
+
+    # Раунды 0, 2, 4, ... — (first1, first2), раунды 1, 3, ... — (first2, first1)
+    even, odd = (rounds + 1) // 2, rounds // 2
+    index = np.arange(agents)
+    frequencies1 = np.zeros((agents, rows))
+    frequencies2 = np.zeros((agents, cols))
+    np.add.at(frequencies1, (index, first1), even)
+    np.add.at(frequencies1, (index, first2), odd)
+    np.add.at(frequencies2, (index, first2), even)
+    np.add.at(frequencies2, (index, first1), odd)
+
+    payoff1 = even * player1_matrix[first1, first2] + odd * player1_matrix[first2, first1]
+    payoff2 = even * player2_matrix[first1, first2] + odd * player2_matrix[first2, first1]
+    return frequencies1 / rounds, frequencies2 / rounds, payoff1 / rounds, payoff2 / rounds
+
+def _rounds_until_switch(utilities, current, increments):
+    """
+    Через сколько раундов лучший ответ current перестанет быть argmax(utilities + k * increments)
+    (при равенстве выбирается стратегия с меньшим номером). Возвращает inf, если никогда.
+    """
+    index = np.arange(len(current))
+    gap = utilities[index, current][:, None] - utilities
+    growth = increments - increments[index, current][:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = gap / growth
+    # Стратегии с меньшим номером выигрывают уже при равенстве, с большим — только при превышении
+    lower = np.arange(utilities.shape[1])[None, :] < current[:, None]
+    switch = np.where(lower, np.ceil(ratio), np.floor(ratio) + 1)
+    return np.where(growth > 0, np.maximum(switch, 1), np.inf).min(axis=1)
+
+def fictitious_play(player1_matrix, player2_matrix, rounds, agents, rng):
+    """
+    Фиктивная игра: первый ход случайный, далее каждый игрок выбирает лучший ответ
+    на накопленные частоты ходов противника (при равенстве — стратегию с меньшим номером).
+    Пока лучшие ответы обоих игроков не меняются, счетчики растут линейно, поэтому серия
+    одинаковых раундов обрабатывается за один шаг: число шагов равно числу смен лучшего ответа.
+    """
+    rows, cols = player1_matrix.shape
+    index = np.arange(agents)
+    action1, action2 = rng.integers(rows, size=agents), rng.integers(cols, size=agents)
+    # counts1 — ходы второго игрока, которые видел первый, counts2 — наоборот
+    counts1 = np.zeros((agents, cols))
+    counts2 = np.zeros((agents, rows))
+    counts1[index, action2] = 1
+    counts2[index, action1] = 1
+    payoff1 = player1_matrix[action1, action2].astype(float)
+    payoff2 = player2_matrix[action1, action2].astype(float)
+    remaining = np.full(agents, rounds - 1, dtype=float)
+
+    while remaining.any():
+        utilities1 = counts1 @ player1_matrix.T
+        utilities2 = counts2 @ player2_matrix
+        action1, action2 = utilities1.argmax(axis=1), utilities2.argmax(axis=1)
+
+        # Если противник продолжит тот же ход, полезности растут на его столбец (строку) выигрышей
+        steps = np.minimum(_rounds_until_switch(utilities1, action1, player1_matrix[:, action2].T),
+                           _rounds_until_switch(utilities2, action2, player2_matrix[action1, :]))
+        steps = np.minimum(steps, remaining)
+
+        counts1[index, action2] += steps
+        counts2[index, action1] += steps
+        payoff1 += steps * player1_matrix[action1, action2]
+        payoff2 += steps * player2_matrix[action1, action2]
+        remaining -= steps
+
+    return counts2 / rounds, counts1 / rounds, payoff1 / rounds, payoff2 / rounds
+
+def _normalized(payoffs):
+    """Выигрыши, линейно приведенные к отрезку [0, 1] (динамика репликатора от этого не меняет направления)"""
+    spread = payoffs.max() - payoffs.min()
+    return (payoffs - payoffs.min()) / spread if spread > 0 else np.zeros_like(payoffs, dtype=float)
+
+def _player_blocks(rows, cols):
+    """
+    Матрица (rows + cols) × (rows + cols) из единиц внутри блоков стратегий каждого игрока:
+    умножение на нее дает каждой стратегии сумму по стратегиям ее игрока.
+    """
+    blocks = np.zeros((rows + cols, rows + cols))
+    blocks[:rows, :rows] = 1.0
+    blocks[rows:, rows:] = 1.0
+    return blocks
+
+# Динамики репликатора и сопоставления сожалений хранят состояние обоих игроков одним массивом
+# (rows + cols) × agents: строки — стратегии (сначала первого игрока, затем второго), столбцы — агенты.
+# Тогда каждый шаг — несколько операций над целыми массивами в заранее выделенных буферах (out=)
+# без обращения по индексам стратегий, а выигрыши обоих игроков считаются одним умножением матриц
+
+def replicator_dynamics(player1_matrix, player2_matrix, rounds, agents, rng, step=0.5, tol=1e-12):
+    """
+    Дискретная динамика репликатора: доля стратегии растет пропорционально превышению ее выигрыша
+    над средним в популяции. Каждый агент — отдельная пара популяций со случайными начальными долями.
+    Выигрыши приводятся к [0, 1], поэтому при step <= 1 доли остаются распределениями.
+    Моделирование прекращается раньше, если доли у всех агентов изменились меньше чем на tol
+    (проверяется раз в RENORMALIZE_ROUNDS раундов). Возвращает итоговые доли и средние выигрыши в них.
+    """
+    rows, cols = player1_matrix.shape
+    # Выигрыш стратегии первого игрока зависит от долей второго и наоборот; шаг step учтен заранее
+    fitness_matrix = np.zeros((rows + cols, rows + cols))
+    fitness_matrix[:rows, rows:] = step * _normalized(player1_matrix)
+    fitness_matrix[rows:, :rows] = step * _normalized(player2_matrix).T
+    blocks = _player_blocks(rows, cols)
+
+    # Массив создается построчным (C-порядок): для транспонированных долей умножение матриц в разы медленнее
+    shares = np.empty((rows + cols, agents))
+    shares[:rows] = rng.dirichlet(np.ones(rows), size=agents).T
+    shares[rows:] = rng.dirichlet(np.ones(cols), size=agents).T
+    fitness, weighted, average = np.empty_like(shares), np.empty_like(shares), np.empty_like(shares)
+
+    for round_index in range(rounds):
+        np.matmul(fitness_matrix, shares, out=fitness)
+        np.multiply(shares, fitness, out=weighted)
+        np.matmul(blocks, weighted, out=average)
+        fitness -= average
+        fitness *= shares
+        shares += fitness
+        if round_index % RENORMALIZE_ROUNDS == RENORMALIZE_ROUNDS - 1:
+            if np.abs(fitness).max() < tol:
+                break
+            shares[shares < EXTINCT_SHARE] = 0.0
+            shares /= blocks @ shares
+
+    shares1, shares2 = shares[:rows].T, shares[rows:].T
+    payoff1 = np.einsum("ij,jk,ik->i", shares1, player1_matrix, shares2)
+    payoff2 = np.einsum("ij,jk,ik->i", shares1, player2_matrix, shares2)
+    return shares1, shares2, payoff1, payoff2
+
+def _skip_uniforms(rng, count):
+    """Сдвигает rng так, как если бы из него было получено count чисел rng.random"""
+    if isinstance(rng.bit_generator, (np.random.PCG64, np.random.PCG64DXSM)):
+        # Каждое число rng.random — ровно одно 64-битное значение генератора
+        rng.bit_generator.advance(count)
+        return
+    for start in range(0, count, RANDOM_BLOCK_ELEMENTS):
+        rng.random(min(RANDOM_BLOCK_ELEMENTS, count - start))
+
+def _rounds_until_positive(regrets, growth):
+    """Сколько раундов (считая текущий) неположительные сожаления, растущие на growth за раунд, останутся <= 0"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        steps = np.floor(-regrets / growth) + 1
+    return np.where((growth > 0) & (regrets <= 0), steps, np.inf).min(axis=0)
+
+def _deterministic_rounds(regrets1, regrets2, player1_matrix, player2_matrix):
+    """
+    Агенты, у которых оба игрока ходят детерминированно: у каждого положительно ровно одно сожаление
+    (или у игрока всего одна стратегия).
+    Пока игрок выбирает эту стратегию, ее сожаление не меняется, а остальные растут на постоянную
+    величину, поэтому известно, сколько раундов подряд будет сыгран тот же совместный ход.
+    Возвращает ходы обоих игроков и это число раундов (0 для агентов со случайным выбором).
+    """
+    action1, action2 = regrets1.argmax(axis=0), regrets2.argmax(axis=0)
+    deterministic = ((np.count_nonzero(regrets1 > 0, axis=0) == 1) | (len(regrets1) == 1)) \
+        & ((np.count_nonzero(regrets2 > 0, axis=0) == 1) | (len(regrets2) == 1))
+    growth1 = player1_matrix[:, action2] - player1_matrix[action1, action2]
+    growth2 = player2_matrix[action1, :].T - player2_matrix[action1, action2]
+    steps = np.minimum(_rounds_until_positive(regrets1, growth1), _rounds_until_positive(regrets2, growth2))
+    return action1, action2, np.where(deterministic, steps, 0)
+
+def _regret_matching_rounds(regrets, uniforms, regret_deltas, sums_matrix, cell_weights, rows):
+    """
+    Раунды сопоставления сожалений для агентов — столбцов regrets (массив обновляется на месте).
+    uniforms — случайные числа формы (раунды, 2, агенты). Возвращает номера совместных ходов (раунды, агенты).
+    """
+    strategies, agents = regrets.shape
+    weights, sums, deltas = np.empty_like(regrets), np.empty_like(regrets), np.empty_like(regrets)
+    thresholds = np.empty((2, agents))
+    below = np.empty((strategies - 2, agents))
+    cell_values = np.empty((1, agents))
+    cells = np.empty((len(uniforms), agents), dtype=np.intp)
+
+    for uniform, cell in zip(uniforms, cells):
+        # Небольшой нижний порог дает равновероятный выбор, когда положительных сожалений нет
+        np.maximum(regrets, 1e-12, out=weights)
+        np.matmul(sums_matrix, weights, out=sums)
+        # Номер хода игрока — число его нарастающих сумм (без последней) не выше порога
+        np.multiply(sums[-2:], uniform, out=thresholds)
+        np.less_equal(sums[:rows - 1], thresholds[0], out=below[:rows - 1])
+        np.less_equal(sums[rows - 1:-2], thresholds[1], out=below[rows - 1:])
+        np.matmul(cell_weights, below, out=cell_values)
+        cell[:] = cell_values[0]
+        np.take(regret_deltas, cell, axis=1, out=deltas, mode="clip")
+        regrets += deltas
+    return cells
+
+def regret_matching(player1_matrix, player2_matrix, rounds, agents, rng):
+    """
+    Сопоставление сожалений (Харт и Мас-Колелл): стратегия выбирается с вероятностью, пропорциональной
+    положительному накопленному сожалению о том, что она не играла; без сожалений — равновероятно.
+    Эмпирическое распределение ходов сходится к множеству грубых коррелированных равновесий.
+    Раунды со случайным выбором моделируются по одному, а агенты, у которых у обоих игроков положительно
+    ровно одно сожаление, ходят детерминированно и проходят такие раунды сериями. Случайные числа
+    расходуются так же, как при моделировании каждого раунда (в пропущенных сериях генератор сдвигается
+    на них), поэтому результат от пропусков не меняется. Возвращает частоты ходов и средние выигрыши.
+    """
+    rows, cols = player1_matrix.shape
+    strategies = rows + cols
+    # Изменение сожалений всех стратегий после совместного хода (i, j) — столбец i * cols + j:
+    # u1(k, j) - u1(i, j) для первого игрока и u2(i, k) - u2(i, j) для второго
+    played1, played2 = np.divmod(np.arange(rows * cols), cols)
+    regret_deltas = np.vstack([player1_matrix[:, played2] - player1_matrix[played1, played2],
+                               player2_matrix[played1, :].T - player2_matrix[played1, played2]])
+    # Нарастающие суммы весов внутри блока игрока без последней (нижний треугольник) и полные суммы
+    blocks = _player_blocks(rows, cols)
+    lower = np.tril(blocks)
+    sums_matrix = np.vstack([np.delete(lower, [rows - 1, strategies - 1], axis=0), blocks[[0, rows]]])
+    # Номер совместного хода: action1 * cols + action2
+    cell_weights = np.concatenate([np.full(rows - 1, cols, dtype=float), np.ones(cols - 1)])[None, :]
+
+    regrets = np.zeros((strategies, agents))
+    # Частоты совместных ходов (i, j) каждого агента; из них в конце получаются частоты и выигрыши
+    joint = np.zeros(agents * rows * cols)
+    offsets = np.arange(agents) * (rows * cols)
+    block_rounds = max(1, min(REGRET_CHECK_ROUNDS, RANDOM_BLOCK_ELEMENTS // (2 * agents)))
+
+    done = 0
+    while done < rounds:
+        block = min(block_rounds, rounds - done)
+        action1, action2, steps = _deterministic_rounds(regrets[:rows], regrets[rows:], player1_matrix, player2_matrix)
+        cells = action1 * cols + action2
+        frozen = steps >= block
+
+        if steps.all():
+            # Раунды до первой возможной смены хода у кого-либо из агентов проходят без случайного выбора
+            block = int(min(steps.min(), rounds - done))
+            _skip_uniforms(rng, block * 2 * agents)
+            regrets += regret_deltas[:, cells] * block
+            joint[offsets + cells] += block
+            done += block
+            continue
+
+        uniforms = rng.random((block, 2, agents))
+        if frozen.mean() >= FROZEN_SHARE:
+            regrets[:, frozen] += regret_deltas[:, cells[frozen]] * block
+            joint[offsets[frozen] + cells[frozen]] += block
+            active = np.flatnonzero(~frozen)
+            active_regrets = regrets[:, active]
+            played = _regret_matching_rounds(active_regrets, uniforms[:, :, active], regret_deltas,
+                                             sums_matrix, cell_weights, rows)
+            regrets[:, active] = active_regrets
+            joint += np.bincount((played + offsets[active]).ravel(), minlength=len(joint))
+        else:
+            played = _regret_matching_rounds(regrets, uniforms, regret_deltas, sums_matrix, cell_weights, rows)
+            joint += np.bincount((played + offsets).ravel(), minlength=len(joint))
+        done += block
+
+    joint = joint.reshape(agents, rows, cols) / rounds
+    payoff1 = (joint * player1_matrix).sum(axis=(1, 2))
+    payoff2 = (joint * player2_matrix).sum(axis=(1, 2))
+    return joint.sum(axis=2), joint.sum(axis=1), payoff1, payoff2
+
+DYNAMICS = {
+    "tit-for-tat": tit_for_tat,
+    "fictitious-play": fictitious_play,
+    "replicator": replicator_dynamics,
+    "regret-matching": regret_matching,
+}
+
+def _simulate_chunk(player1_matrix, player2_matrix, dynamics, rounds, agents, seed, params):
+    return DYNAMICS[dynamics](player1_matrix, player2_matrix, rounds, agents, np.random.default_rng(seed), **params)
+
+def simulate(player1_matrix, player2_matrix, dynamics="fictitious-play", rounds=1000, agents=1000,
+             seed=None, workers=None, **params):
+    """
+    Разыгрывает игру rounds раундов для agents независимых пар агентов по выбранной динамике (ключ DYNAMICS).
+    params передаются функции динамики (opening, step, tol).
+    Агенты делятся между workers процессами (по умолчанию — по числу ядер, но не меньше
+    MIN_AGENTS_PER_WORKER агентов на процесс); у каждой части свой дочерний seed, поэтому результат
+    зависит от seed и числа частей — для воспроизводимости на разных машинах задавайте workers явно.
+    Возвращает словарь: strategy_p1, strategy_p2 — частоты или доли стратегий каждого агента
+    (формы (agents, rows) и (agents, cols)), payoff_p1, payoff_p2 — средние выигрыши за раунд.
+
+    Производительность на одном ядре для 2000 агентов и игр 2×2…4×4 (10^6 раундов):
+    "tit-for-tat" — сотые доли секунды; "fictitious-play" — от миллисекунд до нескольких секунд
+    (время растет с числом смен лучшего ответа); "replicator" — 30–55 с без досрочной остановки
+    (около 30–55 мкс на раунд), при сходимости — секунды; "regret-matching" — сотые доли секунды,
+    если агенты приходят к равновесию в чистых стратегиях, и 70–110 с (около 70–110 мкс на раунд),
+    если выбор остается случайным, как в «камень, ножницы, бумага». Время раунда почти линейно
+    по числу агентов, поэтому для больших популяций ускорение от workers близко к числу ядер.
+    """
+    if dynamics not in DYNAMICS:
+        raise ValueError(f"Неизвестная динамика: {dynamics}")
+    if rounds < 1 or agents < 1:
+        raise ValueError("Число раундов и агентов должно быть положительным.")
+    player1_matrix = np.asarray(player1_matrix, dtype=float)
+    player2_matrix = np.asarray(player2_matrix, dtype=float)
+
+    workers = min(workers or os.cpu_count() or 1, max(1, agents // MIN_AGENTS_PER_WORKER))
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    sizes = [len(part) for part in np.array_split(np.arange(agents), workers)]
+    if workers == 1:
+        parts = [_simulate_chunk(player1_matrix, player2_matrix, dynamics, rounds, agents, seeds[0], params)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_simulate_chunk, player1_matrix, player2_matrix, dynamics, rounds,
+                                       size, child, params) for size, child in zip(sizes, seeds)]
+            parts = [future.result() for future in futures]
+
+    strategy1, strategy2, payoff1, payoff2 = (np.concatenate(values) for values in zip(*parts))
+    return {"strategy_p1": strategy1, "strategy_p2": strategy2, "payoff_p1": payoff1, "payoff_p2": payoff2}
+
+def convergence_report(player1_matrix, player2_matrix, result, tol=0.05):
+    """
+    Сравнивает итог моделирования с равновесиями игры.
+    equilibria — равновесия в чистых стратегиях (как в nash_equilibria); distance — для каждого агента
+    расстояние L1 от его пары стратегий до ближайшего из них (inf, если их нет), nearest — номер этого равновесия;
+    exploitability — суммарный выигрыш, который игроки получили бы, перейдя к лучшему ответу
+    (ноль — в точности равновесие Нэша, в том числе смешанное);
+    converged_share — доля агентов, у которых exploitability не больше tol.
+    """
+    player1_matrix = np.asarray(player1_matrix, dtype=float)
+    player2_matrix = np.asarray(player2_matrix, dtype=float)
+    strategy1, strategy2 = result["strategy_p1"], result["strategy_p2"]
+    equilibria = [(int(i), int(j)) for i, j in pure_nash_equilibria(player1_matrix, player2_matrix)]
+
+    if equilibria:
+        rows, cols = np.array(equilibria).T
+        distances = (np.abs(strategy1[:, None, :] - np.eye(player1_matrix.shape[0])[rows]).sum(axis=2)
+                     + np.abs(strategy2[:, None, :] - np.eye(player1_matrix.shape[1])[cols]).sum(axis=2))
+        nearest = distances.argmin(axis=1)
+        distance = distances[np.arange(len(distances)), nearest]
+    else:
+        nearest = np.full(len(strategy1), -1)
+        distance = np.full(len(strategy1), np.inf)
+
+    # Выгода от лучшего ответа против смешанной стратегии противника
+    values1 = strategy2 @ player1_matrix.T
+    values2 = strategy1 @ player2_matrix
+    exploitability = (values1.max(axis=1) - np.einsum("ij,ij->i", strategy1, values1)
+                      + values2.max(axis=1) - np.einsum("ij,ij->i", strategy2, values2))
+
+    return {
+        "equilibria": equilibria,
+        "distance": distance,
+        "nearest": nearest,
+        "exploitability": exploitability,
+        "converged_share": float(np.mean(exploitability <= tol)),
+    }
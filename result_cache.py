@@ -0,0 +1,257 @@
+"""
+Кэш результатов анализа игр по содержимому матриц выигрышей.
+
+Ключ — sha256 от канонического представления игры (формы и выигрышей обоих игроков
+в float64, поэтому целочисленная и вещественная записи одной игры совпадают) и имени операции
+вместе с настройками решателя, от которых зависит результат (operation_name):
+"maximin", "nash", "weak-dom", "strict-dom", "mixed-nash:lemke-howson:0", "security:auto:1e-07".
+Кэш двухуровневый: LRU в памяти процесса и SQLite-файл рядом с users.db, общий для
+интерфейса и пакетного анализа (batch.py). Оба уровня ограничены по объему, при переполнении
+удаляются давно не использованные результаты.
+
+Результат — кортеж массивов NumPy и чисел. В файл он записывается в формате .npy без pickle,
+поэтому чтение кэша не может выполнить чужой код.
+"""
+import collections
+import hashlib
+import io
+import os
+import threading
+import time
+
+import numpy as np
+
+import database
+
+# Файл кэша лежит в том же каталоге, что и база пользователей
+CACHE_PATH = os.path.join(os.path.dirname(database.DB_PATH), "results.db")
+# Ограничения объема (в байтах сериализованных результатов) для памяти и файла
+MEMORY_CACHE_BYTES = 64 << 20
+DISK_CACHE_BYTES = 256 << 20
+# Для игр меньше этого числа ячеек анализ быстрее, чем хеширование и обращение к файлу
+CACHE_MIN_ELEMENTS = 1 << 10
+# Время последнего использования в файле обновляется не чаще, чем раз в столько секунд,
+# и не при чтении, а пачкой вместе со следующей записью (или когда накопится TOUCH_BATCH ключей):
+# чтение из кэша не должно ждать блокировку на запись
+TOUCH_INTERVAL = 600
+TOUCH_BATCH = 256
+# Сколько самых давно не использованных результатов читается за один запрос при переполнении файла
+EVICT_BATCH = 64
+
+def _create_schema(cursor):
+    cursor.execute('''CREATE TABLE IF NOT EXISTS results (
+                      key BLOB PRIMARY KEY,
+                      operation TEXT NOT NULL,
+                      size INTEGER NOT NULL,
+                      used_at REAL NOT NULL,
+                      value BLOB NOT NULL)''')
+    cursor.execute('''CREATE INDEX IF NOT EXISTS results_used_at ON results (used_at)''')
+
+    # Общий объем результатов поддерживается триггерами, поэтому он верен при записи из нескольких процессов
+    # и проверка переполнения не просматривает таблицу
+    cursor.execute('''CREATE TABLE IF NOT EXISTS results_total (
+                      id INTEGER PRIMARY KEY CHECK (id = 1),
+                      size INTEGER NOT NULL)''')
+    cursor.execute('''INSERT OR IGNORE INTO results_total (id, size)
+                      SELECT 1, COALESCE(SUM(size), 0) FROM results''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS results_insert AFTER INSERT ON results BEGIN
+                      UPDATE results_total SET size = size + NEW.size WHERE id = 1; END''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS results_delete AFTER DELETE ON results BEGIN
+                      UPDATE results_total SET size = size - OLD.size WHERE id = 1; END''')
+    cursor.execute('''CREATE TRIGGER IF NOT EXISTS results_update AFTER UPDATE OF size ON results BEGIN
+                      UPDATE results_total SET size = size + NEW.size - OLD.size WHERE id = 1; END''')
+
+def operation_name(operation, *settings):
+    """
+    Имя операции для ключа вместе с настройками, влияющими на результат:
+    operation_name("security", "auto", 1e-7) == "security:auto:1e-07".
+    """
+    return ":".join([operation, *map(str, settings)])
+
+def game_digest(player1_matrix, player2_matrix):
+    """
+    Хеш содержимого игры: форма и выигрыши обоих игроков в float64 (-0.0 приводится к 0.0).
+    """
+    digest = hashlib.sha256()
+    digest.update(np.asarray(np.shape(player1_matrix), dtype="<i8").tobytes())
+    for payoffs in (player1_matrix, player2_matrix):
+        canonical = np.ascontiguousarray(payoffs, dtype="<f8") + 0.0
+        digest.update(memoryview(canonical).cast("B"))
+    return digest.digest()
+
+def result_key(digest, operation):
+    """Ключ результата операции для игры с хешем digest"""
+    return hashlib.sha256(digest + operation.encode("utf-8")).digest()
+
+def _freeze(values):
+    """
+    Копирует результат в кортеж неизменяемых массивов и чисел NumPy, чтобы вызывающий код
+    не мог испортить закэшированное значение.
+    """
+    frozen = []
+    for value in values:
+        array = np.array(value)
+        if array.ndim == 0:
+            frozen.append(array.item())
+            continue
+        array.flags.writeable = False
+        frozen.append(array)
+    return tuple(frozen)
+
+def _encode(values):
+    buffer = io.BytesIO()
+    for value in values:
+        np.save(buffer, np.asarray(value), allow_pickle=False)
+    return buffer.getvalue()
+
+def _decode(blob):
+    buffer = io.BytesIO(blob)
+    values = []
+    while buffer.tell() < len(blob):
+        values.append(np.load(buffer, allow_pickle=False))
+    return _freeze(values)
+
+class ResultCache:
+    """
+    Двухуровневый кэш результатов. path=None отключает файловый уровень.
+    Объект можно использовать из нескольких потоков; каждый процесс создает свой объект,
+    а общий файл разделяется через WAL SQLite.
+    """
+    def __init__(self, path=CACHE_PATH, memory_bytes=MEMORY_CACHE_BYTES, disk_bytes=DISK_CACHE_BYTES,
+                 min_elements=CACHE_MIN_ELEMENTS):
+        self.path = path
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.min_elements = min_elements
+        self._memory = collections.OrderedDict()
+        self._memory_used = 0
+        # Ключи, прочитанные из файла, для которых нужно обновить время использования
+        self._touched = {}
+        self._lock = threading.Lock()
+        self.memory_hits = self.disk_hits = self.misses = 0
+
+    def get(self, key):
+        """Возвращает сохраненный результат или None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+
+        if self.path is not None:
+            row = database.get_connection(self.path, _create_schema).execute(
+                "SELECT value, used_at FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                blob, used_at = bytes(row[0]), row[1]
+                values = _decode(blob)
+                self._remember(key, values, len(blob))
+                now = time.time()
+                with self._lock:
+                    self.disk_hits += 1
+                    if now - used_at > TOUCH_INTERVAL:
+                        self._touched[key] = now
+                    flush = len(self._touched) >= TOUCH_BATCH
+                if flush:
+                    with database.transaction(self.path, _create_schema) as cursor:
+                        self._flush_touched(cursor)
+                return values
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, operation, values):
+        """Сохраняет результат (кортеж массивов и чисел) на обоих уровнях и возвращает его неизменяемую копию"""
+        values = _freeze(values)
+        blob = _encode(values)
+        self._remember(key, values, len(blob))
+
+        if self.path is not None and len(blob) <= self.disk_bytes:
+            with database.transaction(self.path, _create_schema) as cursor:
+                # INSERT OR REPLACE удалил бы строку без срабатывания триггера удаления
+                cursor.execute("INSERT INTO results (key, operation, size, used_at, value) VALUES (?, ?, ?, ?, ?) "
+                               "ON CONFLICT (key) DO UPDATE SET size = excluded.size, used_at = excluded.used_at, "
+                               "value = excluded.value", (key, operation, len(blob), time.time(), blob))
+                self._flush_touched(cursor)
+                self._evict_disk(cursor)
+        return values
+
+    def _flush_touched(self, cursor):
+        """Записывает накопленные времена использования прочитанных из файла результатов"""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        cursor.executemany("UPDATE results SET used_at = ? WHERE key = ?",
+                           [(used_at, key) for key, used_at in touched.items()])
+
+    def _remember(self, key, values, size):
+        if size > self.memory_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_used -= previous[1]
+            self._memory[key] = (values, size)
+            self._memory_used += size
+            while self._memory_used > self.memory_bytes:
+                _, (_, evicted) = self._memory.popitem(last=False)
+                self._memory_used -= evicted
+
+    def _evict_disk(self, cursor):
+        """
+        Удаляет давно не использованные результаты, пока файл не уложится в disk_bytes.
+        Кандидаты читаются по индексу used_at пачками по EVICT_BATCH, удаляется ровно столько, сколько нужно.
+        """
+        excess = cursor.execute("SELECT size FROM results_total").fetchone()[0] - self.disk_bytes
+        while excess > 0:
+            evicted = []
+            for key, size in cursor.execute("SELECT key, size FROM results ORDER BY used_at LIMIT ?", (EVICT_BATCH,)):
+                evicted.append((key,))
+                excess -= size
+                if excess <= 0:
+                    break
+            if not evicted:
+                break
+            cursor.executemany("DELETE FROM results WHERE key = ?", evicted)
+
+    def cached(self, operation, player1_matrix, player2_matrix, compute, digest=None):
+        """
+        Возвращает результат операции для игры из кэша или вычисляет его вызовом compute()
+        и сохраняет. operation — имя вместе с настройками решателя (operation_name).
+        compute должна вернуть кортеж массивов и чисел; None не кэшируется
+        (например, поиск, прерванный по лимиту времени). digest — уже посчитанный game_digest,
+        чтобы не хешировать игру заново для каждой операции.
+        Игры меньше min_elements ячеек не кэшируются.
+        """
+        if np.size(player1_matrix) < self.min_elements:
+            return compute()
+        key = result_key(digest or game_digest(player1_matrix, player2_matrix), operation)
+        values = self.get(key)
+        if values is not None:
+            return values
+        values = compute()
+        if values is None:
+            return None
+        return self.put(key, operation, values)
+
+    def clear(self):
+        """Очищает оба уровня кэша"""
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+        with self._lock:
+            self._touched.clear()
+        if self.path is not None:
+            with database.transaction(self.path, _create_schema) as cursor:
+                cursor.execute("DELETE FROM results")
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+def default_cache():
+    """Общий для процесса кэш с файлом CACHE_PATH"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+        return _default_cache
@@ -0,0 +1,192 @@
+import csv
+import itertools
+import time
+from io import StringIO
+import numpy as np
+import database
+from Functions import parse_bimatrix, parse_bimatrix_uncached, format_payoff, save_csv_to_db
+
+# Выигрыши хранятся как сырые буферы little-endian; форма и тип записываются в отдельных столбцах.
+# Целочисленные игры, помещающиеся в int32, занимают 4 байта на выигрыш вместо 8.
+INT_DTYPE = "<i4"
+FLOAT_DTYPE = "<f8"
+
+def encode_payoffs(player1_matrix, player2_matrix):
+    """
+    Кодирует массивы выигрышей в компактные байтовые буферы.
+    Возвращает (тип, байты первого игрока, байты второго игрока).
+    """
+    player1_matrix = np.asarray(player1_matrix)
+    player2_matrix = np.asarray(player2_matrix)
+    info = np.iinfo(np.int32)
+
+    dtype = FLOAT_DTYPE
+    if all(np.all(np.mod(m, 1) == 0) and (m.size == 0 or (m.min() >= info.min and m.max() <= info.max))
+           for m in (player1_matrix, player2_matrix)):
+        dtype = INT_DTYPE
+
+    return dtype, player1_matrix.astype(dtype).tobytes(), player2_matrix.astype(dtype).tobytes()
+
+def decode_payoffs(dtype, rows, cols, player1_blob, player2_blob):
+    """
+    Восстанавливает массивы выигрышей из буферов прямо в памяти, без копирования через файлы.
+    """
+    player1_matrix = np.frombuffer(player1_blob, dtype=dtype).reshape(rows, cols)
+    player2_matrix = np.frombuffer(player2_blob, dtype=dtype).reshape(rows, cols)
+    return player1_matrix, player2_matrix
+
+def save_game(username, player1_matrix, player2_matrix):
+    """
+    Сохраняет игру пользователя в таблицу games и возвращает ее id.
+    """
+    rows, cols = np.shape(player1_matrix)
+    dtype, player1_blob, player2_blob = encode_payoffs(player1_matrix, player2_matrix)
+
+    with database.transaction() as cursor:
+        cursor.execute('''INSERT INTO games (username, created_at, rows, cols, dtype, player1, player2)
+                          VALUES (?, ?, ?, ?, ?, ?, ?)''',
+                       (username, time.time(), rows, cols, dtype, player1_blob, player2_blob))
+        return cursor.lastrowid
+
+def load_game(game_id):
+    """
+    Загружает игру по id. Возвращает (массив первого игрока, массив второго игрока) или None.
+    """
+    row = database.get_connection().execute(
+        '''SELECT dtype, rows, cols, player1, player2 FROM games WHERE id = ?''', (game_id,)).fetchone()
+    return decode_payoffs(*row) if row else None
+
+def load_latest_game(username):
+    """
+    Загружает последнюю сохраненную игру пользователя или возвращает None.
+    """
+    row = database.get_connection().execute(
+        '''SELECT dtype, rows, cols, player1, player2 FROM games
+           WHERE username = ? ORDER BY created_at DESC, id DESC LIMIT 1''', (username,)).fetchone()
+    return decode_payoffs(*row) if row else None
+
+def list_games(username):
+    """
+    Возвращает список игр пользователя: (id, время сохранения, строк, столбцов), новые первыми.
+    """
+    return database.get_connection().execute(
+        '''SELECT id, created_at, rows, cols FROM games
+           WHERE username = ? ORDER BY created_at DESC, id DESC''', (username,)).fetchall()
+
+def matrices_to_csv(player1_matrix, player2_matrix):
+    """
+    Преобразует игру в CSV-данные с ячейками "(a;b)" в том виде, в каком их хранит users.csv_file.
+    Выигрыши записываются без округления, поэтому csv_to_matrices возвращает ту же игру.
+    """
+    csv_buffer = StringIO()
+    writer = csv.writer(csv_buffer)
+    for row1, row2 in zip(player1_matrix, player2_matrix):
+        writer.writerow([f"({format_payoff(a, exact=True)};{format_payoff(b, exact=True)})"
+                         for a, b in zip(row1, row2)])
+    return csv_buffer.getvalue().encode()
+
+def csv_to_matrices(csv_data):
+    """
+    Разбирает CSV-данные из users.csv_file в памяти. Возвращает (массив первого игрока, массив второго игрока).
+    """
+    data = [row for row in csv.reader(StringIO(bytes(csv_data).decode())) if row]
+    if not data:
+        raise ValueError("Файл CSV пуст.")
+
+    # Ячейки старых CSV без значения записывались как "0"
+    data = [[value if value != '0' else '(0;0)' for value in row] for row in data]
+    return parse_bimatrix(data)
+
+# Сколько ячеек разбирать за один шаг потоковой загрузки
+STREAM_CHUNK_CELLS = 1 << 18
+
+def _iter_csv_rows(file):
+    """Записи CSV без пустых строк — так же, как их отбирает csv_to_matrices"""
+    return (row for row in csv.reader(file) if row)
+
+def _count_csv_shape(path):
+    """
+    Первый проход по файлу: число непустых записей CSV и число ячеек в первой из них.
+    Считаются записи, а не строки файла: ячейка в кавычках может содержать перевод строки.
+    """
+    rows = 0
+    cols = None
+    with open(path, "r", newline="") as file:
+        for row in _iter_csv_rows(file):
+            if cols is None:
+                cols = len(row)
+            rows += 1
+    if not rows:
+        raise ValueError("Файл CSV пуст.")
+    return rows, cols
+
+def load_csv_streaming(path, memmap_path=None, dtype=np.float64):
+    """
+    Загружает большую игру из CSV-файла с ячейками "(a;b)", не держа в памяти весь текст.
+    Строки разбираются пачками прямо в заранее выделенные массивы; при заданном memmap_path
+    массивы создаются как файлы .npy, отображенные в память ({memmap_path}.player1.npy и
+    {memmap_path}.player2.npy), и пиковое потребление памяти не зависит от размера игры.
+    Возвращает (массив первого игрока, массив второго игрока).
+    """
+    rows, cols = _count_csv_shape(path)
+
+    if memmap_path is None:
+        player1_matrix = np.empty((rows, cols), dtype=dtype)
+        player2_matrix = np.empty((rows, cols), dtype=dtype)
+    else:
+        player1_matrix = np.lib.format.open_memmap(f"{memmap_path}.player1.npy", mode="w+",
+                                                   dtype=dtype, shape=(rows, cols))
+        player2_matrix = np.lib.format.open_memmap(f"{memmap_path}.player2.npy", mode="w+",
+                                                   dtype=dtype, shape=(rows, cols))
+
+    chunk_rows = max(1, STREAM_CHUNK_CELLS // cols)
+    with open(path, "r", newline="") as file:
+        reader = _iter_csv_rows(file)
+        start = 0
+        while start < rows:
+            chunk = list(itertools.islice(reader, chunk_rows))
+            if not chunk:
+                raise ValueError(f"В файле {path} {start} строк вместо {rows}: файл изменился во время загрузки.")
+            if any(len(row) != cols for row in chunk):
+                raise ValueError(f"Строки файла {path} имеют разную длину.")
+            # Ячейки старых CSV без значения записывались как "0"
+            chunk = [[value if value != '0' else '(0;0)' for value in row] for row in chunk]
+            try:
+                chunk1, chunk2 = parse_bimatrix_uncached(chunk)
+            except ValueError as e:
+                raise ValueError(f"Строки {start + 1}-{start + len(chunk)}: {e}") from None
+            player1_matrix[start:start + len(chunk)] = chunk1
+            player2_matrix[start:start + len(chunk)] = chunk2
+            start += len(chunk)
+        if next(reader, None) is not None:
+            raise ValueError(f"В файле {path} больше {rows} строк: файл изменился во время загрузки.")
+
+    if memmap_path is not None:
+        player1_matrix.flush()
+        player2_matrix.flush()
+    return player1_matrix, player2_matrix
+
+def open_memmap_game(memmap_path, mode="r"):
+    """
+    Открывает игру, ранее сохраненную load_csv_streaming(..., memmap_path), без чтения в память.
+    """
+    return (np.load(f"{memmap_path}.player1.npy", mmap_mode=mode),
+            np.load(f"{memmap_path}.player2.npy", mmap_mode=mode))
+
+def import_csv_blob(username):
+    """
+    Переносит CSV-данные пользователя из users.csv_file в таблицу games.
+    Возвращает id новой игры или None, если данных нет.
+    """
+    result = database.get_connection().execute(
+        "SELECT csv_file FROM users WHERE username = ?", (username,)).fetchone()
+
+    if not result or not result[0]:
+        return None
+    return save_game(username, *csv_to_matrices(result[0]))
+
+def export_csv_blob(username, player1_matrix, player2_matrix):
+    """
+    Записывает игру в users.csv_file в прежнем CSV-формате.
+    """
+    save_csv_to_db(username, matrices_to_csv(player1_matrix, player2_matrix))
@@ -0,0 +1,118 @@
+"""
+Проверки repeated.py: событийная фиктивная игра должна в точности совпадать
+с прямым моделированием по раундам, включая выбор меньшего номера при равенстве;
+сопоставление сожалений с пропуском детерминированных раундов — тоже.
+
+Запуск из корня проекта:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from repeated import fictitious_play, regret_matching
+
+def naive_fictitious_play(player1_matrix, player2_matrix, rounds, agents, rng):
+    """Фиктивная игра раунд за раундом для каждого агента отдельно"""
+    rows, cols = player1_matrix.shape
+    first1, first2 = rng.integers(rows, size=agents), rng.integers(cols, size=agents)
+    frequencies1, frequencies2 = np.zeros((agents, rows)), np.zeros((agents, cols))
+    payoff1, payoff2 = np.zeros(agents), np.zeros(agents)
+
+    for agent in range(agents):
+        action1, action2 = first1[agent], first2[agent]
+        seen1, seen2 = np.zeros(cols), np.zeros(rows)
+        for _ in range(rounds):
+            frequencies1[agent, action1] += 1
+            frequencies2[agent, action2] += 1
+            payoff1[agent] += player1_matrix[action1, action2]
+            payoff2[agent] += player2_matrix[action1, action2]
+            seen1[action2] += 1
+            seen2[action1] += 1
+            # argmax выбирает первую из равных стратегий
+            action1 = int(np.argmax(player1_matrix @ seen1))
+            action2 = int(np.argmax(seen2 @ player2_matrix))
+
+    return frequencies1 / rounds, frequencies2 / rounds, payoff1 / rounds, payoff2 / rounds
+
+MATCHING_PENNIES = np.array([[1, -1], [-1, 1]])
+ROCK_PAPER_SCISSORS = np.array([[0, -1, 1], [1, 0, -1], [-1, 1, 0]])
+PRISONERS_DILEMMA = (np.array([[3, 0], [5, 1]]), np.array([[3, 5], [0, 1]]))
+
+def _random_game(seed, rows, cols, high):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, high, (rows, cols)), rng.integers(0, high, (rows, cols))
+
+GAMES = {
+    "matching-pennies": (MATCHING_PENNIES, -MATCHING_PENNIES),
+    "rock-paper-scissors": (ROCK_PAPER_SCISSORS, -ROCK_PAPER_SCISSORS),
+    "prisoners-dilemma": PRISONERS_DILEMMA,
+    "all-equal": (np.ones((3, 3)), np.ones((3, 3))),
+    # Малый диапазон выигрышей дает много равенств полезностей
+    "many-ties": _random_game(1, 3, 4, 2),
+    "random-3x5": _random_game(2, 3, 5, 10),
+    "random-4x2": _random_game(3, 4, 2, 10),
+}
+
+@pytest.mark.parametrize("name", list(GAMES))
+@pytest.mark.parametrize("rounds", [1, 2, 37, 400])
+def test_fictitious_play_matches_naive_simulation(name, rounds):
+    player1_matrix, player2_matrix = (np.asarray(matrix, dtype=float) for matrix in GAMES[name])
+    agents = 25
+
+    expected = naive_fictitious_play(player1_matrix, player2_matrix, rounds, agents, np.random.default_rng(7))
+    result = fictitious_play(player1_matrix, player2_matrix, rounds, agents, np.random.default_rng(7))
+
+    for actual, wanted in zip(result, expected):
+        np.testing.assert_array_equal(actual, wanted)
+
+def _regret_matching_choice(regrets, uniform):
+    """Стратегия с вероятностью, пропорциональной положительному сожалению; без них — равновероятно"""
+    weights = np.maximum(regrets, 0.0)
+    if not weights.any():
+        weights = np.ones_like(regrets)
+    return int(np.count_nonzero(np.cumsum(weights)[:-1] <= uniform * weights.sum()))
+
+def naive_regret_matching(player1_matrix, player2_matrix, rounds, agents, rng):
+    """Сопоставление сожалений раунд за раундом для каждого агента отдельно"""
+    rows, cols = player1_matrix.shape
+    regrets1, regrets2 = np.zeros((agents, rows)), np.zeros((agents, cols))
+    joint = np.zeros((agents, rows, cols))
+
+    for _ in range(rounds):
+        uniforms = rng.random((2, agents))
+        for agent in range(agents):
+            action1 = _regret_matching_choice(regrets1[agent], uniforms[0, agent])
+            action2 = _regret_matching_choice(regrets2[agent], uniforms[1, agent])
+            joint[agent, action1, action2] += 1
+            regrets1[agent] += player1_matrix[:, action2] - player1_matrix[action1, action2]
+            regrets2[agent] += player2_matrix[action1, :] - player2_matrix[action1, action2]
+
+    joint /= rounds
+    return (joint.sum(axis=2), joint.sum(axis=1),
+            (joint * player1_matrix).sum(axis=(1, 2)), (joint * player2_matrix).sum(axis=(1, 2)))
+
+REGRET_GAMES = dict(GAMES, **{
+    "coordination": (np.array([[2, 0], [0, 1]]), np.array([[2, 0], [0, 1]])),
+    "single-row": (np.array([[1, 2, 3]]), np.array([[3, 1, 2]])),
+    "random-4x4": _random_game(5, 4, 4, 10),
+})
+
+@pytest.mark.parametrize("name", list(REGRET_GAMES))
+@pytest.mark.parametrize("rounds", [1, 37, 300])
+@pytest.mark.parametrize("bit_generator", [np.random.PCG64, np.random.MT19937])
+# У одного агента серии детерминированных раундов обрываются, и моделирование возвращается к случайному выбору
+@pytest.mark.parametrize("agents", [1, 20])
+def test_regret_matching_matches_naive_simulation(name, rounds, bit_generator, agents):
+    player1_matrix, player2_matrix = (np.asarray(matrix, dtype=float) for matrix in REGRET_GAMES[name])
+
+    expected = naive_regret_matching(player1_matrix, player2_matrix, rounds, agents,
+                                     np.random.Generator(bit_generator(7)))
+    result = regret_matching(player1_matrix, player2_matrix, rounds, agents, np.random.Generator(bit_generator(7)))
+
+    for actual, wanted in zip(result, expected):
+        np.testing.assert_array_equal(actual, wanted)
@@ -0,0 +1,43 @@
+"""
+Проверки storage.py: сохранение игры в CSV и обратный разбор не должны менять выигрыши.
+
+Запуск из корня проекта:
+    python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import matrices_to_csv, csv_to_matrices, load_csv_streaming
+
+def _random_game(seed):
+    rng = np.random.default_rng(seed)
+    player1_matrix = rng.standard_normal((7, 5)) * 10.0 ** rng.integers(-8, 12, (7, 5))
+    player2_matrix = rng.integers(-1000, 1000, (7, 5)).astype(float)
+    return player1_matrix, player2_matrix
+
+GAMES = {
+    "many-digits": (np.array([[1234567.5, 0.1], [-2.5e-7, 1e20]]), np.array([[3.14159265, 1 / 3], [0.0, -7.0]])),
+    "random-0": _random_game(0),
+    "random-1": _random_game(1),
+}
+
+@pytest.mark.parametrize("name", list(GAMES))
+def test_csv_round_trip_is_exact(name):
+    player1_matrix, player2_matrix = GAMES[name]
+    result1, result2 = csv_to_matrices(matrices_to_csv(player1_matrix, player2_matrix))
+    np.testing.assert_array_equal(result1, player1_matrix)
+    np.testing.assert_array_equal(result2, player2_matrix)
+
+@pytest.mark.parametrize("name", list(GAMES))
+def test_streaming_load_matches_csv(name, tmp_path):
+    player1_matrix, player2_matrix = GAMES[name]
+    path = tmp_path / "game.csv"
+    path.write_bytes(matrices_to_csv(player1_matrix, player2_matrix))
+    result1, result2 = load_csv_streaming(str(path))
+    np.testing.assert_array_equal(result1, player1_matrix)
+    np.testing.assert_array_equal(result2, player2_matrix)
@@ -0,0 +1,57 @@
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+import threading
+
+class AnalysisCancelled(Exception):
+    """Вычисление прервано пользователем."""
+
+# Сигналы задачи; QRunnable не является QObject, поэтому они вынесены в отдельный класс
+class WorkerSignals(QObject):
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+# Задача для QThreadPool: выполняет вычисление вне потока интерфейса
+class AnalysisWorker(QRunnable):
+    def __init__(self, func, *args, **kwargs):
+        """
+        func вызывается в рабочем потоке как func(*args, progress=..., **kwargs).
+        Обратный вызов progress(доля) передает прогресс в интерфейс и
+        выбрасывает AnalysisCancelled, если пользователь отменил задачу.
+        """
+        super().__init__()
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancel_event = threading.Event()
+        self._last_percent = -1
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    def is_cancelled(self):
+        return self._cancel_event.is_set()
+
+    def report_progress(self, fraction):
+        if self._cancel_event.is_set():
+            raise AnalysisCancelled()
+
+        # Сигнал отправляется только при смене процента, чтобы не переполнять очередь событий
+        percent = int(fraction * 100)
+        if percent != self._last_percent:
+            self._last_percent = percent
+            self.signals.progress.emit(percent)
+
+    def run(self):
+        try:
+            result = self.func(*self.args, progress=self.report_progress, **self.kwargs)
+            # Отмена могла прийти уже после последней проверки
+            if self._cancel_event.is_set():
+                raise AnalysisCancelled()
+        except AnalysisCancelled:
+            self.signals.cancelled.emit()
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.finished.emit(result)